@@ -0,0 +1,61 @@
+"""Автомат Ахо-Корасик: поиск всех вхождений набора строк за один проход по тексту."""
+from collections import deque
+
+
+class Automaton:
+    """Автомат строится один раз по парам (образец, значение).
+
+    iter_matches(text) выдаёт (конец, образец, значение) для каждого вхождения
+    каждого образца, включая перекрывающиеся; время - O(длина текста + вхождения).
+    """
+
+    def __init__(self, patterns=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._size = 0
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        self._build()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add(self, pattern: str, value):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append((pattern, value))
+        self._size += 1
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Вхождения более коротких образцов, заканчивающихся в том же месте
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str):
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern, value in out[node]:
+                yield index + 1, pattern, value
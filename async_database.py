@@ -0,0 +1,151 @@
+"""Асинхронный доступ к БД для обработчиков.
+
+Запросы выполняются вне event loop: все изменения идут через поток-писатель с
+групповой фиксацией (database.group_writer), чтения - через небольшой пул потоков.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+
+import database
+
+_readers = ThreadPoolExecutor(max_workers=4, thread_name_prefix="db-reader")
+
+
+async def _write(op, *args):
+    """Дождаться, пока операция будет зафиксирована в составе пачки"""
+    return await asyncio.wrap_future(database.group_writer.submit(op, *args))
+
+
+async def _read(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_readers, partial(fn, *args, **kwargs))
+
+
+async def upsert_user(chat_id: int, username: str, first_name: str, last_name: str):
+    user_id = database.cached_user_id(chat_id, username, first_name, last_name)
+    if user_id is not None:
+        return user_id
+    return await _write(database._upsert_user, chat_id, username, first_name, last_name)
+
+
+async def add_plant(user_id: int, name: str, type_: str = None, photo_file_id: str = None,
+                    watering_every_days: int = None):
+    return await _write(database._add_plant, user_id, name, type_, photo_file_id, watering_every_days)
+
+
+async def list_plants(user_id: int):
+    return await _read(database.list_plants, user_id)
+
+
+async def get_plant(plant_id: int):
+    return await _read(database.get_plant, plant_id)
+
+
+async def delete_plant(plant_id: int):
+    return await _write(database._delete_plant, plant_id)
+
+
+async def set_watering_schedule(plant_id: int, watering_interval_days: int):
+    return await _write(database._set_watering_schedule, plant_id, watering_interval_days)
+
+
+async def get_plants_needing_watering():
+    return await _read(database.get_plants_needing_watering)
+
+
+async def get_watering_schedules():
+    return await _read(database.get_watering_schedules)
+
+
+async def mark_watered(plant_id: int, watered_at=None):
+    return await _write(database._mark_watered, plant_id, watered_at)
+
+
+async def mark_watered_many(plant_ids: list):
+    return await _write(database._mark_watered_many, plant_ids)
+
+
+async def get_overdue_plants(chat_id: int):
+    return await _read(database.get_overdue_plants, chat_id)
+
+
+async def get_digest_chat_ids(chat_ids: list) -> set:
+    return await _read(database.get_digest_chat_ids, chat_ids)
+
+
+async def toggle_reminder_digest(chat_id: int) -> bool:
+    return await _write(database._toggle_reminder_digest, chat_id)
+
+
+async def record_reminders_sent(plant_ids: list):
+    return await _write(database._record_reminders_sent, plant_ids)
+
+
+async def get_cached_diagnosis(file_unique_id: str, since):
+    return await _read(database.get_cached_diagnosis, file_unique_id, since)
+
+
+async def find_similar_diagnoses(phash: int, since):
+    return await _read(database.find_similar_diagnoses, phash, since)
+
+
+async def save_diagnosis(file_unique_id: str, phash: int, result: str, created_at: str = None):
+    created_at = created_at or datetime.utcnow().isoformat(timespec="seconds")
+    return await _write(database._save_diagnosis, file_unique_id, phash, result, created_at)
+
+
+async def purge_diagnosis_cache(before) -> int:
+    return await _write(database._purge_diagnosis_cache, before)
+
+
+async def get_kb_version() -> int:
+    return await _read(database.get_kb_version)
+
+
+async def load_knowledge_base():
+    return await _read(database.load_knowledge_base)
+
+
+async def record_unknown_names(rows: list):
+    return await _write(database._record_unknown_names, rows)
+
+
+async def get_top_unknown_names(limit: int):
+    return await _read(database.get_top_unknown_names, limit)
+
+
+async def get_trefle_cache(key: str):
+    return await _read(database.get_trefle_cache, key)
+
+
+async def save_trefle_cache(key: str, payload: str, fetched_at: str):
+    return await _write(database._save_trefle_cache, key, payload, fetched_at)
+
+
+async def purge_trefle_cache(before) -> int:
+    return await _write(database._purge_trefle_cache, before)
+
+
+async def get_latin_translation(source: str):
+    return await _read(database.get_latin_translation, source)
+
+
+async def save_latin_translation(source: str, translation: str = None):
+    return await _write(database._save_latin_translation, source, translation)
+
+
+async def count_trefle_species() -> int:
+    return await _read(database.count_trefle_species)
+
+
+async def search_trefle_species(query: str, limit: int = 1):
+    return await _read(database.search_trefle_species, query, limit)
+
+
+def shutdown():
+    """Дождаться завершения запросов и закрыть соединения"""
+    database.group_writer.stop()
+    _readers.shutdown(wait=True)
+    database.close_connections()
+
@@ -0,0 +1,68 @@
+"""Микробенчмарк функций database.py: новое соединение на каждый вызов против пула.
+
+Запуск: python benchmarks/bench_database.py [количество операций]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+import database  # noqa: E402
+
+pooled_get_conn = database.get_conn
+
+
+@contextmanager
+def legacy_get_conn():
+    """Поведение до пула: новое соединение без настроек на каждый вызов"""
+    conn = sqlite3.connect(database.DB_PATH)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def run(label, fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return n / elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    database.init_db()
+    user_id = database.upsert_user(1, "bench", "Bench", "User")
+    plant_ids = [database.add_plant(user_id, f"Растение {i}", watering_every_days=3) for i in range(100)]
+
+    cases = [
+        # Мимо user_cache: иначе оба прогона отвечают из кэша и соединение не участвует
+        ("upsert_user", lambda i: database._run_write(database._upsert_user, 1, "bench", "Bench", "User")),
+        ("add_plant", lambda i: database.add_plant(user_id, "Фикус")),
+        ("list_plants", lambda i: database.list_plants(user_id)),
+        ("get_plant", lambda i: database.get_plant(plant_ids[i % len(plant_ids)])),
+        ("set_watering_schedule", lambda i: database.set_watering_schedule(plant_ids[i % len(plant_ids)], 7)),
+        ("mark_watered", lambda i: database.mark_watered(plant_ids[i % len(plant_ids)])),
+        ("get_plants_needing_watering", lambda i: database.get_plants_needing_watering()),
+    ]
+
+    print(f"{'функция':<30}{'до, оп/с':>12}{'после, оп/с':>14}{'ускорение':>12}")
+    for name, fn in cases:
+        database.get_conn = legacy_get_conn
+        before = run(name, fn, n)
+        database.get_conn = pooled_get_conn
+        after = run(name, fn, n)
+        print(f"{name:<30}{before:>12.0f}{after:>14.0f}{after / before:>11.1f}x")
+
+    database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
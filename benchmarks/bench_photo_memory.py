@@ -0,0 +1,71 @@
+"""Пиковая память на один запрос диагностики: старый путь через temp.jpg и json=payload
+против потокового base64-тела из буфера в памяти.
+
+Запуск: python benchmarks/bench_photo_memory.py [путь к jpeg]
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plant_id  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_request_body(image: bytes) -> bytes:
+    """Как раньше: файл целиком -> base64 str -> dict -> json -> bytes"""
+    img_base64 = base64.b64encode(image).decode("utf-8")
+    payload = {"images": [img_base64], "health": "all", "classification_level": "species"}
+    return json.dumps(payload).encode("utf-8")
+
+
+async def streamed_request_body(image: bytearray) -> int:
+    """Как сейчас: тело отдаётся кусками, в памяти живёт только текущий кусок"""
+    tracemalloc.start()
+    length, body = plant_id.encode_identification_body([image], health="all", classification_level="species")
+    sent = 0
+    async for chunk in body:
+        sent += len(chunk)
+    assert sent == length
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def measure(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "temp.jpg")
+    with open(path, "rb") as f:
+        image = bytearray(f.read())
+
+    streamed = b"".join(asyncio.run(_collect(image)))
+    assert json.loads(streamed) == json.loads(legacy_request_body(bytes(image)))
+
+    legacy_peak = measure(lambda: legacy_request_body(bytes(image)))
+    streamed_peak = asyncio.run(streamed_request_body(image))
+
+    size_kb = len(image) / 1024
+    print(f"фото: {size_kb:.0f} КБ")
+    print(f"до (temp.jpg + json=payload): {legacy_peak / 1024:>8.0f} КБ сверх буфера фото")
+    print(f"после (потоковое тело):       {streamed_peak / 1024:>8.0f} КБ сверх буфера фото")
+
+
+async def _collect(image):
+    _, body = plant_id.encode_identification_body([image], health="all", classification_level="species")
+    return [chunk async for chunk in body]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Микробенчмарк сборки статических ответов: построение на каждый вызов против готовых фрагментов.
+
+Сравниваются ответ на симптомы, базовый уход за растением и клавиатура главного меню.
+Прежние реализации воспроизведены ниже (словарь ухода копируется на каждый вызов,
+как раньше создавался литерал из 25 записей).
+
+Запуск: python benchmarks/bench_rendering.py [количество вызовов]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Справочник растений читается из БД: отдельная временная БД с применёнными миграциями
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+from telegram import ReplyKeyboardMarkup  # noqa: E402
+
+import database  # noqa: E402
+
+from config import PLANT_DISEASES  # noqa: E402
+from handlers.rendering import (  # noqa: E402
+    GENERAL_CARE_INFO,
+    MAIN_KEYBOARD,
+    MAIN_MENU,
+    PLANT_CARE_INFO,
+    render_symptom_diagnosis,
+)
+from handlers.plant_names import get_basic_care_info  # noqa: E402
+
+DISEASES = list(PLANT_DISEASES)[:3]
+PLANT_NAMES = ["Мой фикус", "Орхидея фаленопсис", "Неизвестное растение", "мирт"]
+
+
+def legacy_symptom_diagnosis(diseases):
+    response = "🔍 *Результаты диагностики:*\n\n"
+    for disease_name in diseases:
+        disease_info = PLANT_DISEASES[disease_name]
+        response += f"*{disease_name.upper()}*\n"
+        response += f"*Возможные причины:* {', '.join(disease_info['causes'])}\n"
+        response += f"*Лечение:* {disease_info['treatment']}\n"
+        response += f"*Профилактика:* {disease_info['prevention']}\n\n"
+    return response
+
+
+def legacy_basic_care_info(plant_name):
+    plant_name_lower = plant_name.lower()
+    care_info = dict(PLANT_CARE_INFO)
+    for key, info in care_info.items():
+        if key in plant_name_lower:
+            return info
+    return GENERAL_CARE_INFO
+
+
+def run(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    database.init_db()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    assert legacy_symptom_diagnosis(DISEASES) == render_symptom_diagnosis(DISEASES)
+    for name in PLANT_NAMES:
+        assert legacy_basic_care_info(name) == get_basic_care_info(name)
+
+    cases = [
+        ("ответ на симптомы",
+         lambda i: legacy_symptom_diagnosis(DISEASES),
+         lambda i: render_symptom_diagnosis(DISEASES)),
+        ("базовый уход",
+         lambda i: legacy_basic_care_info(PLANT_NAMES[i % len(PLANT_NAMES)]),
+         lambda i: get_basic_care_info(PLANT_NAMES[i % len(PLANT_NAMES)])),
+        ("клавиатура меню",
+         lambda i: ReplyKeyboardMarkup(MAIN_KEYBOARD, resize_keyboard=True),
+         lambda i: MAIN_MENU),
+    ]
+
+    print(f"{'ответ':<22}{'до, мкс':>10}{'после, мкс':>13}{'ускорение':>12}")
+    for name, before_fn, after_fn in cases:
+        before = run(before_fn, n)
+        after = run(after_fn, n)
+        print(f"{name:<22}{before:>10.2f}{after:>13.2f}{before / after:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Микробенчмарк поиска симптомов: цикл по PLANT_DISEASES против автомата Ахо-Корасик.
+
+Словарь симптомов искусственно увеличивается в 1, 10 и 100 раз: к каждой болезни
+добавляются синтетические симптомы из слов настоящих.
+
+Запуск: python benchmarks/bench_symptoms.py [количество сообщений]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aho_corasick import Automaton  # noqa: E402
+from config import PLANT_DISEASES  # noqa: E402
+
+MESSAGES = [
+    "у фикуса желтые листья и какой-то белый налет снизу",
+    "на листьях паутина и сухие пятна, воздух в квартире сухой",
+    "растение вялое, корни темные, есть запах гнили",
+    "липкие листья и мелкие насекомые на обратной стороне",
+    "ничего не понимаю, просто грустный цветок",
+]
+
+
+def scaled_diseases(factor: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    words = sorted({word for info in PLANT_DISEASES.values() for s in info['symptoms'] for word in s.split()})
+    diseases = {}
+    for disease, info in PLANT_DISEASES.items():
+        symptoms = list(info['symptoms'])
+        target = len(symptoms) * factor
+        while len(symptoms) < target:
+            symptoms.append(f"{rng.choice(words)} {rng.choice(words)} {rng.choice(words)}")
+        diseases[disease] = {'symptoms': symptoms}
+    return diseases
+
+
+def loop_match(diseases, text):
+    """Прежняя реализация handle_symptoms"""
+    found = []
+    for disease, info in diseases.items():
+        for symptom in info['symptoms']:
+            if symptom in text:
+                found.append(disease)
+                break
+    return found
+
+
+def automaton_match(automaton, text):
+    counts = {}
+    for _, _, disease in automaton.iter_matches(text):
+        counts[disease] = counts.get(disease, 0) + 1
+    return counts
+
+
+def run(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(MESSAGES[i % len(MESSAGES)])
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    print(f"{'словарь':>10}{'симптомов':>12}{'цикл, мкс':>12}{'автомат, мкс':>15}{'ускорение':>12}")
+    for factor in (1, 10, 100):
+        diseases = scaled_diseases(factor)
+        automaton = Automaton((s, d) for d, info in diseases.items() for s in info['symptoms'])
+
+        for text in MESSAGES:
+            assert set(loop_match(diseases, text)) == set(automaton_match(automaton, text))
+
+        before = run(lambda text: loop_match(diseases, text), n)
+        after = run(lambda text: automaton_match(automaton, text), n)
+        print(f"{'x' + str(factor):>10}{len(automaton):>12}{before:>12.1f}{after:>15.1f}{before / after:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
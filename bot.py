@@ -1,7 +1,8 @@
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
-from telegram import ReplyKeyboardMarkup, Update
+from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -13,6 +14,16 @@ from telegram.ext import (
 )
 
 from database import init_db
+import async_database
+from async_database import get_watering_schedules, record_reminders_sent
+from watering_scheduler import scheduler
+from send_queue import send_queue
+from diagnosis_cache import diagnosis_cache
+from diagnosis_queue import diagnosis_queue
+from knowledge_base import knowledge_base
+from unknown_names import unknown_names
+from trefle_cache import trefle_cache
+import http_client
 from handlers.profile import my_plants, build_profile_conversation, build_reminders_conversation, delete_plant_cb, setup_reminders_cb, \
     handle_interval_selection
 from handlers.diagnosis import handle_symptoms
@@ -21,7 +32,9 @@ from handlers.diagnose_photo import diagnose_photo
 from handlers.trefle import build_trefle_conversation
 from handlers.start import start, help_command, back_to_main
 from handlers.gigachat_gardener import build_gardener_conversation
-from handlers.reminders import handle_watered_callback, check_reminders_command, send_manual_reminder
+from handlers.reminders import handle_watered_callback, check_reminders_command, dispatch_reminders, \
+    handle_digest_callback, digest_command, retry_reminders
+from handlers.admin import stats_command, unknown_command
 
 load_dotenv()
 
@@ -35,61 +48,74 @@ if not TOKEN:
     logging.error("❌ BOT_TOKEN не установлен!")
     exit(1)
 
-MAIN_KEYBOARD = [
-    ["🌱 Мои растения", "🔍 Диагностика"],
-    ["📚 Рекомендации", "🌍 Поиск растений"],
-    ["👨‍🌾 Чат с агрономом"]
-]
+background_tasks = set()
 
 
-async def check_watering_reminders(context: ContextTypes.DEFAULT_TYPE):
-    """Проверка напоминаний о поливе"""
-    from database import get_plants_needing_watering
-    plants = get_plants_needing_watering()
+async def send_watering_reminders(bot, plants):
+    """Постановка напоминаний в очередь отправки по растениям, срок полива которых наступил"""
+    print(f"🔍 Наступил срок полива: {len(plants)} растений")
 
-    print(f"🔍 Проверка напоминаний: найдено {len(plants)} растений")
+    try:
+        deliveries = await dispatch_reminders(bot, plants)
+    except Exception:
+        # pop_due уже убрал растения из расписания: без повтора они бы выпали до перезапуска
+        retry_reminders([plant[0] for plant in plants])
+        raise
 
-    if not plants:
-        print("ℹ️ Нет растений, требующих полива")
-        return
+    # Планировщик не ждёт доставки: результаты собираются в фоне
+    task = asyncio.create_task(record_deliveries(deliveries))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
 
-    for plant in plants:
-        plant_id, name, interval, last_watered, chat_id = plant
-        print(f"💧 Растение нуждается в поливе: {name} (ID: {plant_id}, интервал: {interval} дней)")
 
+async def record_sent(plant_ids):
+    """Записать доставленные напоминания; при ошибке БД растения возвращаются в расписание"""
+    try:
+        await record_reminders_sent(plant_ids)
+    except Exception as e:
+        print(f"❌ Ошибка записи отправленных напоминаний: {e}")
+        retry_reminders(plant_ids)
+
+
+async def record_deliveries(deliveries):
+    """Фиксация отправленных напоминаний по мере доставки"""
+    sent_ids = []
+    for plant_ids, chat_id, future in deliveries:
         try:
-            await send_manual_reminder(context.bot, chat_id, name, plant_id)
-            print(f"✅ Напоминание отправлено для {name} в чат {chat_id}")
+            await future
+            sent_ids.extend(plant_ids)
         except Exception as e:
-            print(f"❌ Ошибка отправки напоминания для {name}: {e}")
+            print(f"❌ Ошибка отправки напоминания в чат {chat_id}: {e}")
+            retry_reminders(plant_ids)
+
+        if len(sent_ids) >= 500:
+            await record_sent(sent_ids)
+            sent_ids = []
+
+    await record_sent(sent_ids)
+    print(f"📨 Напоминания обработаны, очередь: {send_queue.stats()}")
 
 
 async def test_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Тестовая команда для создания растения с интервалом 1 день"""
-    from database import add_plant, set_watering_schedule, upsert_user
+    from async_database import add_plant, set_watering_schedule, upsert_user, mark_watered
     import datetime
 
-    user_id = upsert_user(
+    user_id = await upsert_user(
         chat_id=update.effective_chat.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
         last_name=update.effective_user.last_name
     )
 
-    plant_id = add_plant(user_id, "Тестовое растение", "тест")
-
-    set_watering_schedule(plant_id, 1)
+    plant_id = await add_plant(user_id, "Тестовое растение", "тест")
 
-    from database import get_conn
-    with get_conn() as conn:
-        cur = conn.cursor()
-        old_date = (datetime.datetime.now() - datetime.timedelta(days=2)).isoformat()
-        cur.execute("UPDATE plants SET last_watered_at = ? WHERE id = ?", (old_date, plant_id))
-        conn.commit()
+    await set_watering_schedule(plant_id, 1)
+    await mark_watered(plant_id, watered_at=datetime.datetime.utcnow() - datetime.timedelta(days=2))
 
     await update.message.reply_text(
         "✅ Тестовое растение создано с интервалом полива 1 день!\n"
-        "Напоминание придет в течение 5 минут."
+        "Напоминание придет через несколько секунд."
     )
 
 
@@ -101,6 +127,9 @@ def setup_handlers(application):
     application.add_handler(CommandHandler("myplants", my_plants))
     application.add_handler(CommandHandler("check_reminders", check_reminders_command))
     application.add_handler(CommandHandler("test_reminder", test_reminder))  # только для теста
+    application.add_handler(CommandHandler("digest", digest_command))
+    application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("unknown", unknown_command))
 
     application.add_handler(MessageHandler(filters.Regex("^🌱 Мои растения$"), my_plants))
     application.add_handler(MessageHandler(filters.Regex("^🔍 Диагностика$"), diagnose_photo))
@@ -121,26 +150,49 @@ def setup_handlers(application):
     application.add_handler(CallbackQueryHandler(delete_plant_cb, pattern="^delete_"))
     application.add_handler(CallbackQueryHandler(setup_reminders_cb, pattern="^reminders_"))
     application.add_handler(CallbackQueryHandler(handle_watered_callback, pattern="^watered_"))
+    application.add_handler(CallbackQueryHandler(handle_digest_callback, pattern="^digest_"))
     application.add_handler(CallbackQueryHandler(handle_interval_selection, pattern="^interval_"))
     application.add_handler(CallbackQueryHandler(handle_interval_selection, pattern="^custom_interval$"))
 
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_symptoms))
 
 
+async def on_startup(application):
+    """Загрузка расписания полива и запуск планировщика"""
+    send_queue.start()
+    diagnosis_queue.start()
+    await knowledge_base.reload(force=True)
+    knowledge_base.start()
+    unknown_names.start()
+    scheduler.seed(await get_watering_schedules())
+    scheduler.start(lambda plants: send_watering_reminders(application.bot, plants))
+    await diagnosis_cache.purge()
+    await trefle_cache.purge()
+    print(f"🔔 Автоматические напоминания настроены ({len(scheduler)} растений в расписании)")
+
+
+async def on_shutdown(application):
+    """Остановка планировщика, очередей диагностики и отправки, HTTP-клиентов и соединений с БД"""
+    await scheduler.stop()
+    await knowledge_base.stop()
+    await diagnosis_queue.stop()
+    await unknown_names.stop()
+    await send_queue.stop()
+    await http_client.close()
+    async_database.shutdown()
+
+
 def create_application():
     """Создание и настройка приложения"""
-    application = Application.builder().token(TOKEN).build()
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
     setup_handlers(application)
 
-    job_queue = application.job_queue
-    if job_queue:
-        job_queue.run_repeating(
-            check_watering_reminders,
-            interval=300,
-            first=10
-        )
-        print("🔔 Автоматические напоминания настроены")
-
     return application
 
 
@@ -153,7 +205,7 @@ def main():
     application = create_application()
 
     print("🤖 Бот запущен локально...")
-    print("💧 Напоминания будут приходить каждые 5 минут")
+    print("💧 Напоминания приходят точно в срок полива")
     print("🔧 Для теста используйте /test_reminder")
 
     application.run_polling()
@@ -1,5 +1,8 @@
 import os
 
+# Telegram chat_id администраторов через запятую (доступ к служебным командам)
+ADMIN_IDS = {int(chat_id) for chat_id in os.getenv("ADMIN_IDS", "").split(",") if chat_id.strip()}
+
 PLANT_DISEASES = {
     'пожелтение листьев': {
         'symptoms': ['желтые листья', 'пожелтение', 'хлороз'],
@@ -66,5 +69,94 @@ PLANT_DISEASES = {
 WATERING_REMINDERS = {
     'check_interval_hours': 1,
     'max_interval_days': 30,
-    'min_interval_days': 1
-}
\ No newline at end of file
+    'min_interval_days': 1,
+    # Повторные напоминания о неполитом растении: 12 ч, 24 ч, 48 ч, далее раз в 72 ч
+    'renotify_base_hours': 12,
+    'renotify_max_hours': 72,
+    # Через сколько минут повторить напоминание, которое не удалось отправить
+    'retry_minutes': 15,
+    # Сводное напоминание забирает растения чата, срок которых наступит в ближайшие N минут
+    # (должно быть меньше минимального интервала полива)
+    'digest_window_minutes': 60
+}
+
+SEND_QUEUE = {
+    'workers': 16,
+    'global_rate': 30,
+    'per_chat_rate': 1,
+    'max_retries': 5
+}
+
+# Групповая фиксация записей в БД: не больше max_batch операций или max_delay_ms ожидания
+GROUP_COMMIT = {
+    'max_batch': 256,
+    'max_delay_ms': 5
+}
+
+# Кэш профилей пользователей: chat_id -> (user_id, username, first_name, last_name)
+USER_CACHE = {
+    'max_size': 50000
+}
+
+# Общий HTTP-клиент для внешних API (таймауты в секундах)
+HTTP_CLIENT = {
+    'timeout': 30,
+    'connect_timeout': 5,
+    'pool_timeout': 10,
+    'max_connections': 100,
+    'max_keepalive_connections': 20,
+    'keepalive_expiry': 60
+}
+
+# Подготовка фото для plant.id: минимальная сторона выбираемого размера Telegram,
+# бюджет в байтах и максимальная сторона при пережатии
+PHOTO_PREPROCESS = {
+    'min_side': 720,
+    'max_side': 1280,
+    'max_bytes': 150 * 1024,
+    'workers': 2
+}
+
+# Кэш диагностики по фото: срок жизни результата и допустимое расстояние Хэмминга
+# между перцептивными хэшами почти одинаковых фото (не больше 3, см. database.PHASH_BANDS)
+DIAGNOSIS_CACHE = {
+    'ttl_days': 14,
+    'max_distance': 3
+}
+
+# Очередь диагностики фото: одновременных запросов к plant.id и максимум ожидающих
+DIAGNOSIS_QUEUE = {
+    'workers': 4,
+    'max_queued': 50
+}
+
+# Альбомы фото: сколько ждать остальные фото альбома и сколько из них отправлять в plant.id
+PHOTO_ALBUM = {
+    'window_seconds': 1.5,
+    'max_images': 5
+}
+
+# Справочник болезней и растений в БД: как часто проверять, не изменился ли он
+KNOWLEDGE_BASE = {
+    'reload_seconds': 5
+}
+
+# Статистика названий, которых нет в справочнике: как часто сбрасывать в БД
+# и после скольких разных названий в памяти сбросить раньше
+UNKNOWN_NAMES = {
+    'flush_seconds': 60,
+    'max_pending': 500
+}
+
+# Кэш ответов Trefle (поиск и карточки видов): записей в памяти, сколько ответ считается
+# свежим и до какого возраста отдаётся устаревшим, пока обновляется в фоне
+TREFLE_CACHE = {
+    'max_size': 1000,
+    'fresh_seconds': 24 * 3600,
+    'max_age_seconds': 30 * 24 * 3600
+}
+
+# Перевод названий на латынь: сколько не повторять неудавшийся перевод
+TRANSLATION_MEMO = {
+    'negative_ttl_seconds': 24 * 3600
+}
@@ -1,95 +1,450 @@
 import sqlite3
 import os
-import tempfile
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
+
+from config import WATERING_REMINDERS, GROUP_COMMIT, USER_CACHE
+from lru_cache import LRUCache
+from name_index import normalize_name
+from watering_scheduler import scheduler
+
+DB_PATH = os.getenv('DB_PATH', 'plants.db')
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",   # 256 МБ memory-mapped I/O
+    "PRAGMA cache_size=-65536",     # 64 МБ страничного кэша
+    "PRAGMA temp_store=MEMORY",
+)
+
+# chat_id -> (user_id, username, first_name, last_name)
+user_cache = LRUCache(USER_CACHE['max_size'])
+
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+
+# 64-битный перцептивный хэш фото режется на 4 полосы по 16 бит: у хэшей, отличающихся
+# не больше чем в 3 битах, хотя бы одна полоса совпадает, и её можно искать по индексу
+PHASH_BANDS = 4
+
+
+def _due_horizon() -> str:
+    """Граница "пора поливать": сводное напоминание включает растения со сроком в ближайшие минуты"""
+    return (datetime.utcnow() + timedelta(minutes=WATERING_REMINDERS['digest_window_minutes'])).isoformat(
+        timespec="seconds")
+
+
+NEXT_DUE_SQL = "strftime('%Y-%m-%dT%H:%M:%S', julianday({watered}) + {interval})"
+
+
+def _migration_initial(cur):
+    """Базовые таблицы"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chat_id BIGINT UNIQUE NOT NULL,
+        username TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        created_at TIMESTAMP NOT NULL
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS plants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        type TEXT,
+        photo_file_id TEXT,
+        watering_every_days INTEGER,
+        last_watered_at TIMESTAMP,
+        created_at TIMESTAMP NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS care_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        plant_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        note TEXT,
+        created_at TIMESTAMP NOT NULL,
+        FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE
+    )
+    """)
+
+
+def _migration_next_due_at(cur):
+    """Материализованный срок следующего полива с индексом"""
+    if not _column_exists(cur, "plants", "next_due_at"):
+        cur.execute("ALTER TABLE plants ADD COLUMN next_due_at TIMESTAMP")
+    cur.execute("""
+        UPDATE plants
+        SET next_due_at = {next_due}
+        WHERE watering_every_days IS NOT NULL AND last_watered_at IS NOT NULL
+    """.format(next_due=NEXT_DUE_SQL.format(watered="last_watered_at", interval="watering_every_days")))
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plants_next_due_at ON plants(next_due_at)")
+
+
+def _migration_reminder_state(cur):
+    """Состояние доставки напоминаний"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS reminder_state (
+        plant_id INTEGER PRIMARY KEY,
+        last_notified_at TIMESTAMP NOT NULL,
+        notify_count INTEGER NOT NULL DEFAULT 0,
+        next_notify_at TIMESTAMP NOT NULL,
+        FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE
+    )
+    """)
+
+
+def _migration_reminder_digest(cur):
+    """Настройка сводных напоминаний у пользователя"""
+    if not _column_exists(cur, "users", "reminder_digest"):
+        cur.execute("ALTER TABLE users ADD COLUMN reminder_digest INTEGER NOT NULL DEFAULT 1")
+
+
+def _migration_diagnosis_cache(cur):
+    """Кэш результатов диагностики по фото"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS diagnosis_cache (
+        file_unique_id TEXT PRIMARY KEY,
+        phash TEXT,
+        band0 INTEGER,
+        band1 INTEGER,
+        band2 INTEGER,
+        band3 INTEGER,
+        result TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL
+    )
+    """)
+    for band in range(PHASH_BANDS):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_diagnosis_cache_band{band} ON diagnosis_cache(band{band})")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_diagnosis_cache_created_at ON diagnosis_cache(created_at)")
+
+
+def _migration_knowledge_base(cur):
+    """Справочник болезней и растений"""
+    # Начальное наполнение - словари из handlers/disease_dictionary.py
+    from handlers import disease_dictionary as seed
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS kb_diseases (
+        name TEXT PRIMARY KEY,
+        translation TEXT NOT NULL,
+        description TEXT,
+        treatment TEXT,
+        updated_at TIMESTAMP NOT NULL
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS kb_plants (
+        latin_name TEXT PRIMARY KEY,
+        russian_name TEXT NOT NULL,
+        updated_at TIMESTAMP NOT NULL
+    )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_kb_plants_russian_name ON kb_plants(russian_name)")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS kb_watering (
+        name TEXT PRIMARY KEY,
+        guide TEXT NOT NULL,
+        updated_at TIMESTAMP NOT NULL
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS kb_meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """)
+
+    now = datetime.utcnow().isoformat()
+    names = set(seed.DISEASE_TRANSLATIONS) | set(seed.DISEASE_DESCRIPTIONS) | set(seed.TREATMENT_RECOMMENDATIONS)
+    cur.executemany(
+        "INSERT OR IGNORE INTO kb_diseases (name, translation, description, treatment, updated_at) VALUES (?, ?, ?, ?, ?)",
+        [(name.lower(), seed.DISEASE_TRANSLATIONS.get(name, name), seed.DISEASE_DESCRIPTIONS.get(name),
+          seed.TREATMENT_RECOMMENDATIONS.get(name), now) for name in names]
+    )
+    cur.executemany(
+        "INSERT OR IGNORE INTO kb_plants (latin_name, russian_name, updated_at) VALUES (?, ?, ?)",
+        [(latin_name.lower(), russian_name, now) for latin_name, russian_name in seed.PLANT_TRANSLATIONS.items()]
+    )
+    cur.executemany(
+        "INSERT OR IGNORE INTO kb_watering (name, guide, updated_at) VALUES (?, ?, ?)",
+        [(name, guide, now) for name, guide in seed.WATERING_GUIDE.items()]
+    )
+    cur.execute("INSERT OR IGNORE INTO kb_meta (key, value) VALUES ('version', 1)")
+
+
+def _migration_unknown_names(cur):
+    """Статистика названий, которых нет в справочнике"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS unknown_names (
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        probability_sum REAL NOT NULL DEFAULT 0,
+        max_probability REAL NOT NULL DEFAULT 0,
+        first_seen TIMESTAMP NOT NULL,
+        last_seen TIMESTAMP NOT NULL,
+        PRIMARY KEY (kind, name)
+    )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_unknown_names_count ON unknown_names(count DESC)")
+
+
+def _migration_trefle_cache(cur):
+    """Кэш ответов Trefle"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS trefle_cache (
+        key TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        fetched_at TIMESTAMP NOT NULL
+    )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trefle_cache_fetched_at ON trefle_cache(fetched_at)")
+
+
+def _latin_translation_seed():
+    """Пары (русское название, латинское) из начальных словарей растений и полива"""
+    from handlers import disease_dictionary as seed
+    from handlers.plant_names import SYNONYMS
+    from name_index import NameIndex
+
+    pairs = {}
+
+    def add(russian_name, latin_name):
+        russian_name = normalize_name(russian_name)
+        # Из нескольких латинских названий выбирается самое короткое (обычно род)
+        if russian_name and (russian_name not in pairs or len(latin_name) < len(pairs[russian_name])):
+            pairs[russian_name] = latin_name
+
+    for latin_name, russian_name in seed.PLANT_TRANSLATIONS.items():
+        latin_name = latin_name.lower()
+        add(russian_name, latin_name)
+        # "Сансевиерия (Щучий хвост)" -> "сансевиерия", "щучий хвост"
+        if "(" in russian_name:
+            head, _, tail = russian_name.partition("(")
+            add(head, latin_name)
+            add(tail.rstrip(")"), latin_name)
+
+    # Ключи справочника полива: общий род латинских названий, переводы которых указывают на ключ
+    names = [(key, key) for key in seed.WATERING_GUIDE]
+    names += [(synonym, key) for synonym, key in SYNONYMS.items() if key in seed.WATERING_GUIDE]
+    index = NameIndex(names)
+    latin_by_key = {}
+    for latin_name, russian_name in seed.PLANT_TRANSLATIONS.items():
+        key = index.find(russian_name)
+        if key is not None:
+            latin_by_key.setdefault(key, []).append(latin_name.lower().split())
+    for key, latin_names in latin_by_key.items():
+        common = []
+        for words in zip(*latin_names):
+            if len(set(words)) > 1:
+                break
+            common.append(words[0])
+        latin_name = " ".join(common) or " ".join(min(latin_names, key=len))
+        if normalize_name(key) not in pairs:
+            pairs[normalize_name(key)] = latin_name
+        for synonym, synonym_key in SYNONYMS.items():
+            if synonym_key == key:
+                add(synonym, latin_name)
+    return pairs
+
+
+def _migration_latin_translations(cur):
+    """Переводы названий растений на латынь"""
+    # translation = NULL - перевод не удался (отрицательный кэш до истечения срока)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS latin_translations (
+        source TEXT PRIMARY KEY,
+        translation TEXT,
+        created_at TIMESTAMP NOT NULL
+    )
+    """)
+    now = datetime.utcnow().isoformat(timespec="seconds")
+    cur.executemany(
+        "INSERT OR IGNORE INTO latin_translations (source, translation, created_at) VALUES (?, ?, ?)",
+        [(source, translation, now) for source, translation in _latin_translation_seed().items()]
+    )
+
+
+def _migration_trefle_species(cur):
+    """Локальная копия видов Trefle с полнотекстовым индексом"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS trefle_species (
+        id INTEGER PRIMARY KEY,
+        scientific_name TEXT NOT NULL,
+        common_names TEXT,
+        synonyms TEXT,
+        family TEXT,
+        data TEXT NOT NULL,
+        imported_at TIMESTAMP NOT NULL
+    )
+    """)
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS trefle_species_fts USING fts5(
+        scientific_name, common_names, synonyms, family,
+        content='trefle_species', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """)
+
+
+def _migration_plants_user_next_due(cur):
+    """Индекс растений пользователя по сроку полива"""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_plants_user_next_due_at ON plants(user_id, next_due_at)")
+
+
+# Версия схемы хранится в PRAGMA user_version; новые миграции добавляются в конец списка
+MIGRATIONS = [
+    (1, _migration_initial),
+    (2, _migration_next_due_at),
+    (3, _migration_reminder_state),
+    (4, _migration_reminder_digest),
+    (5, _migration_diagnosis_cache),
+    (6, _migration_knowledge_base),
+    (7, _migration_unknown_names),
+    (8, _migration_trefle_cache),
+    (9, _migration_latin_translations),
+    (10, _migration_trefle_species),
+    (11, _migration_plants_user_next_due),
+]
+
+
+def _column_exists(cur, table: str, column: str) -> bool:
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cur.fetchall())
 
-DB_PATH = os.getenv('DB_PATH', '/data/plants.db')
 
 def init_db():
-    """Инициализация БД"""
+    """Инициализация БД и применение миграций"""
     with get_conn() as conn:
         cur = conn.cursor()
+        cur.execute("PRAGMA user_version")
+        current_version = cur.fetchone()[0]
 
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            chat_id BIGINT UNIQUE NOT NULL,
-            username TEXT,
-            first_name TEXT,
-            last_name TEXT,
-            created_at TIMESTAMP NOT NULL
-        )
-        """)
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS plants (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            type TEXT,
-            photo_file_id TEXT,
-            watering_every_days INTEGER,
-            last_watered_at TIMESTAMP,
-            created_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-        """)
-
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS care_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            plant_id INTEGER NOT NULL,
-            action TEXT NOT NULL,
-            note TEXT,
-            created_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (plant_id) REFERENCES plants(id) ON DELETE CASCADE
-        )
-        """)
+        for version, migration in MIGRATIONS:
+            if version <= current_version:
+                continue
+            try:
+                migration(cur)
+                cur.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"🗄️ Применена миграция БД {version}: {migration.__doc__}")
 
-        conn.commit()
+def _connect():
+    directory = os.path.dirname(DB_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    with _connections_lock:
+        _connections.append(conn)
+    return conn
 
 @contextmanager
 def get_conn():
-    conn = sqlite3.connect("plants.db")
+    """Долгоживущее соединение текущего потока"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
     try:
         yield conn
-    finally:
-        conn.close()
+    except Exception:
+        conn.rollback()
+        raise
 
-def upsert_user(chat_id: int, username: str, first_name: str, last_name: str):
+def close_connections():
+    """Закрыть все открытые соединения (при остановке бота)"""
+    with _connections_lock:
+        for conn in _connections:
+            conn.close()
+        _connections.clear()
+    _local.__dict__.pop("conn", None)
+
+def _run_write(op, *args):
+    """Выполнить операцию записи в отдельной транзакции текущего потока"""
+    after_commit = []
     with get_conn() as conn:
-        cur = conn.cursor()
-        now = datetime.utcnow().isoformat()
+        result = op(conn.cursor(), after_commit, *args)
+        conn.commit()
+    for callback in after_commit:
+        callback()
+    return result
 
-        cur.execute("SELECT id FROM users WHERE chat_id = ?", (chat_id,))
-        row = cur.fetchone()
+def cached_user_id(chat_id: int, username: str, first_name: str, last_name: str):
+    """id пользователя из кэша, если профиль не изменился, иначе None"""
+    profile = (username, first_name, last_name)
+    cached = user_cache.get(chat_id, match=lambda value: value[1:] == profile)
+    return cached[0] if cached is not None else None
 
-        if row:
+def _upsert_user(cur, after_commit, chat_id, username, first_name, last_name):
+    now = datetime.utcnow().isoformat()
+    profile = (username, first_name, last_name)
+
+    cur.execute("SELECT id, username, first_name, last_name FROM users WHERE chat_id = ?", (chat_id,))
+    row = cur.fetchone()
+
+    if row:
+        user_id = row[0]
+        if tuple(row[1:]) != profile:
             cur.execute("""
                 UPDATE users SET username=?, first_name=?, last_name=? WHERE chat_id=?
             """, (username, first_name, last_name, chat_id))
-            user_id = row[0]
-        else:
-            cur.execute("""
-                INSERT INTO users (chat_id, username, first_name, last_name, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (chat_id, username, first_name, last_name, now))
-            user_id = cur.lastrowid
+    else:
+        cur.execute("""
+            INSERT INTO users (chat_id, username, first_name, last_name, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (chat_id, username, first_name, last_name, now))
+        user_id = cur.lastrowid
 
-        conn.commit()
+    after_commit.append(partial(user_cache.set, chat_id, (user_id, *profile)))
+    return user_id
+
+def upsert_user(chat_id: int, username: str, first_name: str, last_name: str):
+    user_id = cached_user_id(chat_id, username, first_name, last_name)
+    if user_id is not None:
         return user_id
+    return _run_write(_upsert_user, chat_id, username, first_name, last_name)
+
+def _add_plant(cur, after_commit, user_id, name, type_, photo_file_id, watering_every_days):
+    now = datetime.utcnow().isoformat()
+    cur.execute("""
+        INSERT INTO plants (user_id, name, type, photo_file_id, watering_every_days, last_watered_at, created_at,
+                            next_due_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, {next_due})
+    """.format(next_due=NEXT_DUE_SQL.format(watered="?", interval="?")),
+        (user_id, name, type_, photo_file_id, watering_every_days, now, now, now, watering_every_days))  # ← last_watered_at тоже now
+    plant_id = cur.lastrowid
+
+    if watering_every_days:
+        cur.execute("SELECT chat_id FROM users WHERE id = ?", (user_id,))
+        row = cur.fetchone()
+        if row:
+            after_commit.append(partial(scheduler.schedule, plant_id, name, watering_every_days, now, row[0]))
+    return plant_id
 
 def add_plant(user_id: int, name: str, type_: str = None, photo_file_id: str = None, watering_every_days: int = None):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        now = datetime.utcnow().isoformat()
-        cur.execute("""
-            INSERT INTO plants (user_id, name, type, photo_file_id, watering_every_days, last_watered_at, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (user_id, name, type_, photo_file_id, watering_every_days, now, now))  # ← last_watered_at тоже now
-        conn.commit()
-        return cur.lastrowid
+    return _run_write(_add_plant, user_id, name, type_, photo_file_id, watering_every_days)
 
 def list_plants(user_id: int):
     with get_conn() as conn:
@@ -112,53 +467,514 @@ def get_plant(plant_id: int):
         """, (plant_id,))
         return cur.fetchone()
 
+def _delete_plant(cur, after_commit, plant_id):
+    cur.execute("DELETE FROM care_history WHERE plant_id = ?", (plant_id,))
+    cur.execute("DELETE FROM reminder_state WHERE plant_id = ?", (plant_id,))
+    cur.execute("DELETE FROM plants WHERE id = ?", (plant_id,))
+    after_commit.append(partial(scheduler.unschedule, plant_id))
+
 def delete_plant(plant_id: int):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM care_history WHERE plant_id = ?", (plant_id,))
-        cur.execute("DELETE FROM plants WHERE id = ?", (plant_id,))
-        conn.commit()
+    return _run_write(_delete_plant, plant_id)
+
+def _set_watering_schedule(cur, after_commit, plant_id, watering_interval_days):
+    now = datetime.utcnow().isoformat()
+    cur.execute("""
+        UPDATE plants 
+        SET watering_every_days = ?, last_watered_at = ?, next_due_at = {next_due}
+        WHERE id = ?
+    """.format(next_due=NEXT_DUE_SQL.format(watered="?", interval="?")),
+        (watering_interval_days, now, now, watering_interval_days, plant_id))
+    cur.execute("""
+        SELECT p.name, u.chat_id
+        FROM plants p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.id = ?
+    """, (plant_id,))
+    row = cur.fetchone()
+
+    if row:
+        name, chat_id = row
+        after_commit.append(partial(scheduler.schedule, plant_id, name, watering_interval_days, now, chat_id))
 
 def set_watering_schedule(plant_id: int, watering_interval_days: int):
     """Установить график полива для растения"""
+    return _run_write(_set_watering_schedule, plant_id, watering_interval_days)
+
+def get_plants_needing_watering():
+    """Получить список растений, которые нужно полить (без уже уведомлённых в текущем цикле)"""
+    now = datetime.utcnow().isoformat(timespec="seconds")
     with get_conn() as conn:
         cur = conn.cursor()
+        # Диапазонный поиск по индексу idx_plants_next_due_at
         cur.execute("""
-            UPDATE plants 
-            SET watering_every_days = ?, last_watered_at = ?
-            WHERE id = ?
-        """, (watering_interval_days, datetime.utcnow().isoformat(), plant_id))
-        conn.commit()
+            SELECT p.id, p.name, p.watering_every_days, p.last_watered_at, u.chat_id
+            FROM plants p
+            JOIN users u ON p.user_id = u.id
+            LEFT JOIN reminder_state r ON r.plant_id = p.id
+            WHERE p.next_due_at <= ?
+            AND (r.next_notify_at IS NULL OR r.next_notify_at <= ?)
+        """, (now, now))
+        return cur.fetchall()
 
-def get_plants_needing_watering():
-    """Получить список растений, которые нужно полить"""
+def get_watering_schedules():
+    """Все растения с графиком полива (для загрузки планировщика при старте)"""
     with get_conn() as conn:
         cur = conn.cursor()
         cur.execute("""
-            SELECT p.id, p.name, p.watering_every_days, p.last_watered_at, u.chat_id
+            SELECT p.id, p.name, p.watering_every_days, p.last_watered_at, u.chat_id, r.next_notify_at
             FROM plants p
             JOIN users u ON p.user_id = u.id
-            WHERE p.watering_every_days IS NOT NULL
-            AND p.last_watered_at IS NOT NULL
-            AND (
-                -- Для интервалов меньше 1 дня используем минуты
-                (p.watering_every_days < 1 AND 
-                 (julianday('now') - julianday(p.last_watered_at)) * 1440 > p.watering_every_days * 1440)
-                OR
-                -- Для интервалов 1 день и больше используем дни
-                (p.watering_every_days >= 1 AND 
-                 julianday('now') - julianday(p.last_watered_at) > p.watering_every_days)
-            )
+            LEFT JOIN reminder_state r ON r.plant_id = p.id
+            WHERE p.next_due_at IS NOT NULL
         """)
         return cur.fetchall()
 
-def mark_watered(plant_id: int):
+def _mark_watered(cur, after_commit, plant_id, watered_at):
+    watered_at = watered_at or datetime.utcnow()
+    cur.execute("""
+        UPDATE plants 
+        SET last_watered_at = ?, next_due_at = {next_due}
+        WHERE id = ?
+    """.format(next_due=NEXT_DUE_SQL.format(watered="?", interval="watering_every_days")),
+        (watered_at.isoformat(), watered_at.isoformat(), plant_id))
+    cur.execute("DELETE FROM reminder_state WHERE plant_id = ?", (plant_id,))
+    after_commit.append(partial(scheduler.watered, plant_id, watered_at))
+
+def mark_watered(plant_id: int, watered_at: datetime = None):
     """Отметить растение как политое"""
+    return _run_write(_mark_watered, plant_id, watered_at)
+
+def _mark_watered_many(cur, after_commit, plant_ids):
+    if not plant_ids:
+        return
+
+    watered_at = datetime.utcnow()
+    placeholders = ",".join("?" * len(plant_ids))
+    cur.execute(f"""
+        UPDATE plants
+        SET last_watered_at = ?, next_due_at = {NEXT_DUE_SQL.format(watered="?", interval="watering_every_days")}
+        WHERE id IN ({placeholders})
+    """, (watered_at.isoformat(), watered_at.isoformat(), *plant_ids))
+    cur.execute(f"DELETE FROM reminder_state WHERE plant_id IN ({placeholders})", list(plant_ids))
+
+    for plant_id in plant_ids:
+        after_commit.append(partial(scheduler.watered, plant_id, watered_at))
+
+def mark_watered_many(plant_ids: list):
+    """Отметить несколько растений как политые одним запросом"""
+    return _run_write(_mark_watered_many, plant_ids)
+
+def get_overdue_plants(chat_id: int):
+    """Растения пользователя, срок полива которых наступил (для сводного напоминания)"""
     with get_conn() as conn:
         cur = conn.cursor()
         cur.execute("""
-            UPDATE plants 
-            SET last_watered_at = ?
-            WHERE id = ?
-        """, (datetime.utcnow().isoformat(), plant_id))
-        conn.commit()
\ No newline at end of file
+            SELECT p.id, p.name
+            FROM plants p
+            JOIN users u ON p.user_id = u.id
+            WHERE u.chat_id = ? AND p.next_due_at <= ?
+            ORDER BY p.next_due_at, p.id
+        """, (chat_id, _due_horizon()))
+        return cur.fetchall()
+
+def get_digest_chat_ids(chat_ids: list) -> set:
+    """Из переданных чатов выбрать те, где включены сводные напоминания"""
+    chat_ids = list(chat_ids)
+    result = set()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        # Пачками, чтобы не упереться в лимит параметров SQLite
+        for i in range(0, len(chat_ids), 900):
+            chunk = chat_ids[i:i + 900]
+            placeholders = ",".join("?" * len(chunk))
+            cur.execute(f"SELECT chat_id FROM users WHERE reminder_digest = 1 AND chat_id IN ({placeholders})",
+                        chunk)
+            result.update(row[0] for row in cur.fetchall())
+    return result
+
+def _toggle_reminder_digest(cur, after_commit, chat_id):
+    cur.execute("UPDATE users SET reminder_digest = 1 - reminder_digest WHERE chat_id = ?", (chat_id,))
+    cur.execute("SELECT reminder_digest FROM users WHERE chat_id = ?", (chat_id,))
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+def toggle_reminder_digest(chat_id: int) -> bool:
+    """Переключить режим сводных напоминаний, вернуть новое значение"""
+    return _run_write(_toggle_reminder_digest, chat_id)
+
+def _record_reminders_sent(cur, after_commit, plant_ids):
+    if not plant_ids:
+        return {}
+
+    now = datetime.utcnow()
+    base_hours = WATERING_REMINDERS['renotify_base_hours']
+    max_hours = WATERING_REMINDERS['renotify_max_hours']
+    horizon = _due_horizon()
+
+    placeholders = ",".join("?" * len(plant_ids))
+    cur.execute(f"SELECT plant_id, notify_count FROM reminder_state WHERE plant_id IN ({placeholders})",
+                list(plant_ids))
+    counts = dict(cur.fetchall())
+
+    next_notify = {}
+    rows = []
+    for plant_id in plant_ids:
+        count = counts.get(plant_id, 0) + 1
+        delay_hours = min(base_hours * 2 ** (count - 1), max_hours)
+        next_notify[plant_id] = now + timedelta(hours=delay_hours)
+        rows.append((plant_id, now.isoformat(), count, next_notify[plant_id].isoformat(timespec="seconds"),
+                     plant_id, horizon))
+
+    # Растение могло быть удалено или полито, пока напоминание было в очереди:
+    # тогда повтор не назначается, а срок в планировщике остаётся от полива.
+    # Граница - с окном сводки: растения, добавленные в неё чуть раньше срока, тоже учитываются
+    written = {}
+    for row in rows:
+        cur.execute("""
+            INSERT INTO reminder_state (plant_id, last_notified_at, notify_count, next_notify_at)
+            SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM plants WHERE id = ? AND next_due_at <= ?)
+            ON CONFLICT(plant_id) DO UPDATE SET
+                last_notified_at = excluded.last_notified_at,
+                notify_count = excluded.notify_count,
+                next_notify_at = excluded.next_notify_at
+        """, row)
+        if cur.rowcount:
+            written[row[0]] = next_notify[row[0]]
+
+    for plant_id, notify_at in written.items():
+        after_commit.append(partial(scheduler.snooze, plant_id, notify_at))
+    return written
+
+def record_reminders_sent(plant_ids: list):
+    """Запомнить отправку напоминаний и отложить повтор по экспоненциальной схеме"""
+    return _run_write(_record_reminders_sent, plant_ids)
+
+def _phash_bands(phash: int):
+    return [(phash >> (16 * band)) & 0xFFFF for band in range(PHASH_BANDS)]
+
+def get_cached_diagnosis(file_unique_id: str, since: datetime):
+    """Сохранённый результат диагностики для файла Telegram, не старше since"""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT result FROM diagnosis_cache WHERE file_unique_id = ? AND created_at >= ?",
+                    (file_unique_id, since.isoformat(timespec="seconds")))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+def find_similar_diagnoses(phash: int, since: datetime):
+    """Кандидаты с совпадающей полосой перцептивного хэша: (phash, result, created_at)"""
+    bands = _phash_bands(phash)
+    condition = " OR ".join(f"band{band} = ?" for band in range(PHASH_BANDS))
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT phash, result, created_at
+            FROM diagnosis_cache
+            WHERE ({condition}) AND created_at >= ?
+        """, (*bands, since.isoformat(timespec="seconds")))
+        return [(int(phash, 16), result, created_at) for phash, result, created_at in cur.fetchall()]
+
+def _save_diagnosis(cur, after_commit, file_unique_id, phash, result, created_at):
+    bands = _phash_bands(phash) if phash is not None else [None] * PHASH_BANDS
+    cur.execute("""
+        INSERT OR REPLACE INTO diagnosis_cache
+            (file_unique_id, phash, band0, band1, band2, band3, result, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (file_unique_id, f"{phash:016x}" if phash is not None else None, *bands, result, created_at))
+
+def save_diagnosis(file_unique_id: str, phash: int, result: str, created_at: str = None):
+    """Сохранить результат диагностики (phash может быть None, если Pillow недоступен)"""
+    created_at = created_at or datetime.utcnow().isoformat(timespec="seconds")
+    return _run_write(_save_diagnosis, file_unique_id, phash, result, created_at)
+
+def _purge_diagnosis_cache(cur, after_commit, before):
+    cur.execute("DELETE FROM diagnosis_cache WHERE created_at < ?", (before.isoformat(timespec="seconds"),))
+    return cur.rowcount
+
+def purge_diagnosis_cache(before: datetime) -> int:
+    """Удалить результаты диагностики старше before"""
+    return _run_write(_purge_diagnosis_cache, before)
+
+def get_kb_version() -> int:
+    """Версия справочника: растёт при каждом изменении"""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT value FROM kb_meta WHERE key = 'version'")
+        row = cur.fetchone()
+        return row[0] if row else 0
+
+def load_knowledge_base():
+    """Согласованный снимок справочника: (версия, болезни, растения, полив)"""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        # Все чтения - в одной транзакции, чтобы версия соответствовала данным
+        cur.execute("BEGIN")
+        try:
+            cur.execute("SELECT value FROM kb_meta WHERE key = 'version'")
+            row = cur.fetchone()
+            cur.execute("SELECT name, translation, description, treatment FROM kb_diseases")
+            diseases = cur.fetchall()
+            cur.execute("SELECT latin_name, russian_name FROM kb_plants")
+            plants = cur.fetchall()
+            cur.execute("SELECT name, guide FROM kb_watering")
+            watering = cur.fetchall()
+        finally:
+            conn.commit()
+        return (row[0] if row else 0), diseases, plants, watering
+
+def _bump_kb_version(cur):
+    cur.execute("UPDATE kb_meta SET value = value + 1 WHERE key = 'version'")
+
+def _save_kb_disease(cur, after_commit, name, translation, description, treatment):
+    cur.execute("""
+        INSERT INTO kb_diseases (name, translation, description, treatment, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            translation = excluded.translation,
+            description = COALESCE(excluded.description, kb_diseases.description),
+            treatment = COALESCE(excluded.treatment, kb_diseases.treatment),
+            updated_at = excluded.updated_at
+    """, (name.lower(), translation, description or None, treatment or None, datetime.utcnow().isoformat()))
+    _bump_kb_version(cur)
+
+def save_kb_disease(name: str, translation: str, description: str = None, treatment: str = None):
+    """Добавить или обновить болезнь в справочнике"""
+    return _run_write(_save_kb_disease, name, translation, description, treatment)
+
+def _save_kb_plant(cur, after_commit, latin_name, russian_name):
+    cur.execute("""
+        INSERT INTO kb_plants (latin_name, russian_name, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(latin_name) DO UPDATE SET
+            russian_name = excluded.russian_name,
+            updated_at = excluded.updated_at
+    """, (latin_name.lower(), russian_name, datetime.utcnow().isoformat()))
+    # Новое русское название сразу известно переводу на латынь (поверх неудачных попыток)
+    cur.execute("""
+        INSERT INTO latin_translations (source, translation, created_at) VALUES (?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            translation = excluded.translation,
+            created_at = excluded.created_at
+        WHERE latin_translations.translation IS NULL
+    """, (normalize_name(russian_name), latin_name.lower(), datetime.utcnow().isoformat(timespec="seconds")))
+    _bump_kb_version(cur)
+
+def save_kb_plant(latin_name: str, russian_name: str):
+    """Добавить или обновить перевод латинского названия растения"""
+    return _run_write(_save_kb_plant, latin_name, russian_name)
+
+def _record_unknown_names(cur, after_commit, rows):
+    cur.executemany("""
+        INSERT INTO unknown_names (kind, name, count, probability_sum, max_probability, first_seen, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(kind, name) DO UPDATE SET
+            count = count + excluded.count,
+            probability_sum = probability_sum + excluded.probability_sum,
+            max_probability = MAX(max_probability, excluded.max_probability),
+            last_seen = MAX(last_seen, excluded.last_seen)
+    """, rows)
+
+def record_unknown_names(rows: list):
+    """Добавить накопленные промахи справочника:
+    [(вид, название, сколько раз, сумма вероятностей, наибольшая вероятность, впервые, последний раз)]"""
+    return _run_write(_record_unknown_names, rows)
+
+def get_top_unknown_names(limit: int):
+    """Самые частые названия, которых всё ещё нет в справочнике:
+    [(вид, название, сколько раз, средняя вероятность, наибольшая вероятность, последний раз)]"""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT kind, name, count, probability_sum / count, max_probability, last_seen
+            FROM unknown_names
+            WHERE NOT (kind = 'disease' AND name IN (SELECT name FROM kb_diseases))
+              AND NOT (kind = 'plant' AND name IN (SELECT latin_name FROM kb_plants))
+            ORDER BY count DESC
+            LIMIT ?
+        """, (limit,))
+        return cur.fetchall()
+
+def get_trefle_cache(key: str):
+    """Сохранённый ответ Trefle: (payload, fetched_at) или None"""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT payload, fetched_at FROM trefle_cache WHERE key = ?", (key,))
+        return cur.fetchone()
+
+def _save_trefle_cache(cur, after_commit, key, payload, fetched_at):
+    cur.execute("INSERT OR REPLACE INTO trefle_cache (key, payload, fetched_at) VALUES (?, ?, ?)",
+                (key, payload, fetched_at))
+
+def save_trefle_cache(key: str, payload: str, fetched_at: str):
+    """Сохранить ответ Trefle"""
+    return _run_write(_save_trefle_cache, key, payload, fetched_at)
+
+def _purge_trefle_cache(cur, after_commit, before):
+    cur.execute("DELETE FROM trefle_cache WHERE fetched_at < ?", (before.isoformat(timespec="seconds"),))
+    return cur.rowcount
+
+def purge_trefle_cache(before: datetime) -> int:
+    """Удалить ответы Trefle, полученные раньше before"""
+    return _run_write(_purge_trefle_cache, before)
+
+def get_latin_translation(source: str):
+    """Сохранённый перевод: (translation или None, created_at) либо None, если перевода не было"""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT translation, created_at FROM latin_translations WHERE source = ?", (source,))
+        return cur.fetchone()
+
+def _save_latin_translation(cur, after_commit, source, translation):
+    cur.execute("INSERT OR REPLACE INTO latin_translations (source, translation, created_at) VALUES (?, ?, ?)",
+                (source, translation, datetime.utcnow().isoformat(timespec="seconds")))
+
+def save_latin_translation(source: str, translation: str = None):
+    """Запомнить перевод (None - перевод не удался)"""
+    return _run_write(_save_latin_translation, source, translation)
+
+def _import_trefle_species(cur, after_commit, rows):
+    cur.executemany("""
+        INSERT OR REPLACE INTO trefle_species (id, scientific_name, common_names, synonyms, family, data, imported_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    return cur.rowcount
+
+def import_trefle_species(rows: list) -> int:
+    """Загрузить пачку видов: [(id, научное название, общие названия, синонимы, семейство, JSON, время)].
+    После загрузки всех пачек нужно вызвать rebuild_trefle_species_index()"""
+    return _run_write(_import_trefle_species, rows)
+
+def _rebuild_trefle_species_index(cur, after_commit):
+    cur.execute("INSERT INTO trefle_species_fts(trefle_species_fts) VALUES ('rebuild')")
+
+def rebuild_trefle_species_index():
+    """Перестроить полнотекстовый индекс по таблице trefle_species"""
+    return _run_write(_rebuild_trefle_species_index)
+
+def count_trefle_species() -> int:
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM trefle_species")
+        return cur.fetchone()[0]
+
+def search_trefle_species(query: str, limit: int = 1):
+    """JSON видов, лучше всего совпадающих с запросом (все слова, последнее - как префикс)"""
+    words = re.findall(r"\w+", normalize_name(query))
+    if not words:
+        return []
+    match = " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+    with get_conn() as conn:
+        cur = conn.cursor()
+        # Точное научное название - первым, затем bm25 с весами столбцов
+        cur.execute("""
+            SELECT s.data
+            FROM trefle_species_fts f
+            JOIN trefle_species s ON s.id = f.rowid
+            WHERE trefle_species_fts MATCH ?
+            ORDER BY lower(s.scientific_name) != ?, bm25(trefle_species_fts, 10.0, 5.0, 3.0, 1.0)
+            LIMIT ?
+        """, (match.strip(), " ".join(words), limit))
+        return [row[0] for row in cur.fetchall()]
+
+
+class GroupCommitWriter:
+    """Поток-писатель с групповой фиксацией транзакций.
+
+    Операции копятся до max_batch штук или max_delay секунд и выполняются в одной
+    транзакции (каждая - в своём SAVEPOINT), так что на пачку приходится один commit.
+    Future операции завершается только после фиксации транзакции. Соединение писателя
+    работает с synchronous=FULL: каждый commit пачки ждёт fsync WAL (один на пачку),
+    поэтому завершённая операция переживает и сбой питания.
+    """
+
+    def __init__(self, max_batch: int, max_delay_ms: float):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self.batches = 0
+        self.operations = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="db-group-commit", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, op, *args) -> Future:
+        """Поставить операцию вида op(cur, after_commit, *args) в очередь записи"""
+        self.start()
+        future = Future()
+        self._queue.put((op, args, future))
+        return future
+
+    def _run(self):
+        conn = _connect()
+        conn.isolation_level = None
+        # Остальные соединения пишут с NORMAL (без fsync на commit); писатель обещает долговечность
+        conn.execute("PRAGMA synchronous=FULL")
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(conn, batch)
+            if stopping:
+                return
+
+    def _commit_batch(self, conn, batch):
+        cur = conn.cursor()
+        after_commit = []
+        results = []
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for op, args, future in batch:
+                op_callbacks = []
+                cur.execute("SAVEPOINT op")
+                try:
+                    results.append((future, op(cur, op_callbacks, *args), None))
+                    cur.execute("RELEASE op")
+                    after_commit.extend(op_callbacks)
+                except Exception as e:
+                    cur.execute("ROLLBACK TO op")
+                    cur.execute("RELEASE op")
+                    results.append((future, None, e))
+            cur.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for callback in after_commit:
+            callback()
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+group_writer = GroupCommitWriter(**GROUP_COMMIT)
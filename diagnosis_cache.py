@@ -0,0 +1,76 @@
+"""Кэш результатов диагностики по фото.
+
+Результат plant.id (виды и болезни в разобранном виде) хранится в SQLite и ищется
+сначала по file_unique_id Telegram (то же фото, в том числе пересланное), затем по
+перцептивному хэшу для почти одинаковых фото. Записи старше ttl_days не используются.
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+
+import async_database
+from config import DIAGNOSIS_CACHE
+
+logger = logging.getLogger(__name__)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DiagnosisCache:
+    def __init__(self, ttl_days: int, max_distance: int):
+        self.ttl = timedelta(days=ttl_days)
+        self.max_distance = max_distance
+        self.file_hits = 0
+        self.phash_hits = 0
+        self.misses = 0
+
+    def _since(self) -> datetime:
+        return datetime.utcnow() - self.ttl
+
+    async def get_by_file(self, file_unique_id: str):
+        """Результат для того же файла Telegram или None (промах не считается: дальше ищем по хэшу)"""
+        result = await async_database.get_cached_diagnosis(file_unique_id, self._since())
+        if result is None:
+            return None
+        self.file_hits += 1
+        return json.loads(result)
+
+    async def get_by_image(self, file_unique_id: str, phash: int):
+        """Результат для почти одинакового фото; найденная запись привязывается и к file_unique_id"""
+        if phash is not None:
+            candidates = await async_database.find_similar_diagnoses(phash, self._since())
+            best = min(candidates, key=lambda row: hamming(phash, row[0]), default=None)
+            if best is not None and hamming(phash, best[0]) <= self.max_distance:
+                self.phash_hits += 1
+                _, result, created_at = best
+                # Срок жизни отсчитывается от исходного результата, а не от повторного фото
+                await async_database.save_diagnosis(file_unique_id, phash, result, created_at)
+                return json.loads(result)
+
+        self.misses += 1
+        return None
+
+    async def store(self, file_unique_id: str, phash: int, parsed: dict):
+        await async_database.save_diagnosis(file_unique_id, phash, json.dumps(parsed, ensure_ascii=False))
+
+    async def purge(self) -> int:
+        """Удалить просроченные записи"""
+        removed = await async_database.purge_diagnosis_cache(self._since())
+        if removed:
+            logger.info(f"🧹 Кэш диагностики: удалено {removed} просроченных записей")
+        return removed
+
+    def stats(self) -> dict:
+        hits = self.file_hits + self.phash_hits
+        total = hits + self.misses
+        return {
+            'file_hits': self.file_hits,
+            'phash_hits': self.phash_hits,
+            'misses': self.misses,
+            'hit_rate': round(hits / total * 100, 1) if total else 0.0,
+        }
+
+
+diagnosis_cache = DiagnosisCache(**DIAGNOSIS_CACHE)
@@ -0,0 +1,98 @@
+"""Очередь диагностики фото с ограничением параллельности и длины.
+
+Одновременно выполняется не больше workers запросов к plant.id, остальные ждут
+в очереди длиной до max_queued; когда очередь заполнена, новые фото отклоняются
+сразу, а не копятся в памяти. Время ожидания и обслуживания пишется в гистограммы.
+"""
+import asyncio
+import logging
+import time
+
+from config import DIAGNOSIS_QUEUE
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Очередь диагностики заполнена"""
+
+
+class DiagnosisQueue:
+    def __init__(self, workers: int, max_queued: int):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue = None
+        self._tasks = []
+        self._active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_time = Histogram()
+        self.service_time = Histogram()
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+        logger.info(f"📷 Очередь диагностики остановлена: {self.stats()}")
+
+    def submit(self, job):
+        """Поставить job (функция без аргументов, возвращающая корутину) в очередь.
+
+        Возвращает (future, position), где position - номер в очереди (0, если
+        свободный воркер возьмёт задачу сразу). Если очередь заполнена - QueueFull.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((job, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull() from None
+        position = max(0, self._active + self._queue.qsize() - self.workers)
+        return future, position
+
+    def stats(self) -> dict:
+        return {
+            'queued': self._queue.qsize() if self._queue else 0,
+            'active': self._active,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+        }
+
+    async def _worker(self):
+        while True:
+            job, future, enqueued_at = await self._queue.get()
+            if future.cancelled():
+                self._queue.task_done()
+                continue
+
+            started = time.monotonic()
+            self.wait_time.observe(started - enqueued_at)
+            self._active += 1
+            try:
+                result = await job()
+                self.completed += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._active -= 1
+                self.service_time.observe(time.monotonic() - started)
+                self._queue.task_done()
+
+
+diagnosis_queue = DiagnosisQueue(**DIAGNOSIS_QUEUE)
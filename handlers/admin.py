@@ -0,0 +1,105 @@
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from config import ADMIN_IDS
+from database import group_writer, user_cache
+from diagnosis_cache import diagnosis_cache
+from diagnosis_queue import diagnosis_queue
+from knowledge_base import knowledge_base
+from metrics import LATENCY_BUCKETS
+from send_queue import send_queue
+from singleflight import singleflight
+from trefle_cache import trefle_cache
+from translation_memo import translation_memo
+from unknown_names import unknown_names, DISEASE
+
+
+def is_admin(update: Update) -> bool:
+    return update.effective_chat.id in ADMIN_IDS
+
+
+def _seconds(value) -> str:
+    if value is None:
+        return "—"
+    if value == float("inf"):
+        return f">{LATENCY_BUCKETS[-1]:g} с"
+    return f"≤{value:g} с"
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Служебная статистика бота (/stats)"""
+    if not is_admin(update):
+        return
+
+    queue = send_queue.stats()
+    users = user_cache.stats()
+    diagnoses = diagnosis_cache.stats()
+    photos = diagnosis_queue.stats()
+    kb = knowledge_base.snapshot()
+    trefle = trefle_cache.stats()
+    translations = translation_memo.stats()
+    flights = "".join(
+        f"• {service}: запросов {calls}, объединено {shared}\n"
+        for service, (calls, shared) in sorted(singleflight.stats().items())
+    ) or "• Запросов ещё не было\n"
+    text = (
+        "📊 *Статистика бота*\n\n"
+        "*Очередь отправки:*\n"
+        f"• В очереди: {queue['queued']}\n"
+        f"• Отправляется: {queue['in_flight']}\n"
+        f"• Отправлено: {queue['sent']} ({queue['per_second']} сообщ./с за минуту)\n"
+        f"• Ошибок: {queue['failed']}, повторов: {queue['retries']}\n\n"
+        "*Запись в БД:*\n"
+        f"• Операций: {group_writer.operations} в {group_writer.batches} транзакциях\n\n"
+        "*Кэш пользователей:*\n"
+        f"• Записей: {users['size']} из {users['max_size']}, вытеснено: {users['evictions']}\n"
+        f"• Попаданий: {users['hits']}, промахов: {users['misses']} ({users['hit_rate']}%)\n\n"
+        "*Кэш диагностики:*\n"
+        f"• Попаданий по файлу: {diagnoses['file_hits']}, по хэшу фото: {diagnoses['phash_hits']}\n"
+        f"• Промахов: {diagnoses['misses']} ({diagnoses['hit_rate']}% попаданий)\n\n"
+        "*Очередь диагностики:*\n"
+        f"• В очереди: {photos['queued']}, выполняется: {photos['active']}\n"
+        f"• Готово: {photos['completed']}, ошибок: {photos['failed']}, отклонено: {photos['rejected']}\n"
+        f"• Ожидание (p50/p95): {_seconds(diagnosis_queue.wait_time.percentile(50))}"
+        f" / {_seconds(diagnosis_queue.wait_time.percentile(95))}\n"
+        f"  {diagnosis_queue.wait_time.format()}\n"
+        f"• Обработка (p50/p95): {_seconds(diagnosis_queue.service_time.percentile(50))}"
+        f" / {_seconds(diagnosis_queue.service_time.percentile(95))}\n"
+        f"  {diagnosis_queue.service_time.format()}\n\n"
+        f"*Внешние API* (выполняется: {singleflight.in_flight()}):\n"
+        f"{flights}\n"
+        "*Кэш Trefle:*\n"
+        f"• Записей в памяти: {trefle['size']}, попаданий: {trefle['memory_hits']} в памяти, {trefle['db_hits']} в БД\n"
+        f"• Промахов: {trefle['misses']} ({trefle['hit_rate']}% попаданий), устаревших: {trefle['stale_hits']}\n"
+        f"• Обновляется в фоне: {trefle['refreshing']}, ошибок обновления: {trefle['refresh_errors']}\n\n"
+        "*Перевод на латынь:*\n"
+        f"• Из памяти переводов: {translations['hits']}, известных неудач: {translations['negative_hits']}\n"
+        f"• Запросов к переводчику: {translations['misses']}, неудачных: {translations['failures']}"
+        f" ({translations['hit_rate']}% без переводчика)\n\n"
+        "*Справочник:*\n"
+        f"• Версия: {kb.version}, болезней: {len(kb.disease_translations)}, растений: {len(kb.plant_translations)}\n"
+        f"• Промахов отмечено: {unknown_names.recorded}, ждут записи в БД: {unknown_names.pending()}\n"
+    )
+
+    await update.message.reply_text(text, parse_mode="Markdown")
+
+
+async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Самые частые болезни и растения, которых нет в справочнике (/unknown [N])"""
+    if not is_admin(update):
+        return
+
+    limit = int(context.args[0]) if context.args and context.args[0].isdigit() else 20
+    rows = await unknown_names.top(min(limit, 100))
+    if not rows:
+        await update.message.reply_text("📚 Все названия из ответов plant.id есть в справочнике")
+        return
+
+    lines = [f"📚 *Нет в справочнике (топ {len(rows)}):*\n"]
+    for kind, name, count, mean_probability, max_probability, last_seen in rows:
+        icon = "🦠" if kind == DISEASE else "🌿"
+        lines.append(
+            f"{icon} `{name}` — {count} раз, вероятность {mean_probability:.0%} (до {max_probability:.0%}), "
+            f"последний раз {last_seen[:16].replace('T', ' ')}"
+        )
+    await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
@@ -1,117 +1,208 @@
-import os
-import requests
-import base64
+import asyncio
+import logging
+import time
+
 from telegram import Update
 from telegram.ext import ContextTypes
-from dotenv import load_dotenv
-from handlers.disease_dictionary import (
-    DISEASE_TRANSLATIONS,
-    DISEASE_DESCRIPTIONS,
-    TREATMENT_RECOMMENDATIONS,
-    PLANT_TRANSLATIONS,
-    get_unknown_diseases,
-    add_new_disease
-)
 
-load_dotenv()
+import plant_id
+from config import PHOTO_ALBUM
+from diagnosis_queue import diagnosis_queue, QueueFull
+from diagnosis_cache import diagnosis_cache
+from knowledge_base import knowledge_base
+from unknown_names import unknown_names, DISEASE, PLANT
+from photo_preprocess import select_photo_size, prepare_image, perceptual_hash
+from singleflight import singleflight
+from handlers.plant_names import translate_plant_name
+
+logger = logging.getLogger(__name__)
+
+# media_group_id -> сообщения альбома, собранные за PHOTO_ALBUM['window_seconds']
+_albums = {}
+
+
+def render_diagnosis(parsed: dict) -> str:
+    """Текст ответа по разобранному результату plant.id"""
+    if parsed["is_plant"] is False:
+        return "❌ На фото не распознано растение"
+
+    text = ""
+    if parsed["species"]:
+        best = parsed["species"][0]
+        latin_name = best["name"] or "Неизвестно"
+        plant_name = translate_plant_name(latin_name)
+        prob = round(best["probability"] * 100, 1)
+        common = best["common_names"]
+        if common:
+            text += f"🌱 *Похоже, это:* {plant_name} ({', '.join(common)}) - {prob}%\n\n"
+        else:
+            text += f"🌱 *Похоже, это:* {plant_name} - {prob}%\n\n"
+    else:
+        text += "❓ Вид растения определить не удалось\n\n"
 
-API_KEY = os.getenv("PLANT_API_KEY")
+    if parsed["diseases"]:
+        disease = parsed["diseases"][0]
+        d_name = disease["name"] or "Неизвестная болезнь"
+        d_prob = round(disease["probability"] * 100, 1)
 
+        kb = knowledge_base.snapshot()
+        translated_name = kb.disease_translations.get(d_name.lower(), d_name)
 
-async def diagnose_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if not update.message.photo:
-        await update.message.reply_text("📷 Отправьте фото растения для диагностики")
-        return
+        description = kb.disease_descriptions.get(d_name.lower(), disease["description"])
+        treatment = kb.treatments.get(d_name.lower(), disease["treatment"])
 
-    photo = update.message.photo[-1]
-    file = await context.bot.get_file(photo.file_id)
-    file_path = "temp.jpg"
-    await file.download_to_drive(file_path)
+        text += f"⚠️ *Обнаружена проблема:* {translated_name} ({d_prob}%)\n\n"
 
-    try:
-        with open(file_path, "rb") as f:
-            img_base64 = base64.b64encode(f.read()).decode("utf-8")
-
-        url = "https://api.plant.id/v3/identification"
-        headers = {
-            "Api-Key": API_KEY,
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "images": [img_base64],
-            "health": "all",
-            "classification_level": "species"
-        }
-
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-
-        if not response.ok:
-            await update.message.reply_text(
-                f"⚠️ Ошибка API ({response.status_code}):\n{response.text}"
-            )
-            return
-
-        result = response.json()
-        text = ""
-
-        is_plant = result.get("result", {}).get("is_plant", {}).get("binary")
-        if is_plant is False:
-            await update.message.reply_text("❌ На фото не распознано растение")
-            return
+        if description:
+            text += f"📋 *Описание:* {description}\n\n"
 
-        suggestions = result.get("result", {}).get("classification", {}).get("suggestions", [])
-        if suggestions:
-            best = suggestions[0]
-            latin_name = best.get("name", "Неизвестно")
-            plant_name = PLANT_TRANSLATIONS.get(latin_name.lower(), latin_name)
-            prob = round(best.get("probability", 0) * 100, 1)
-            common = best.get("details", {}).get("common_names", [])
-            if common:
-                text += f"🌱 *Похоже, это:* {plant_name} ({', '.join(common)}) - {prob}%\n\n"
+        if treatment:
+            if isinstance(treatment, str):
+                text += f"💊 *Рекомендации:*\n{treatment}\n"
             else:
-                text += f"🌱 *Похоже, это:* {plant_name} - {prob}%\n\n"
+                if treatment.get("biological"):
+                    text += "🧪 *Биологическое лечение:* " + ", ".join(treatment["biological"]) + "\n"
+                if treatment.get("chemical"):
+                    text += "💊 *Химическое лечение:* " + ", ".join(treatment["chemical"]) + "\n"
         else:
-            text += "❓ Вид растения определить не удалось\n\n"
+            text += "💡 *Общие рекомендации:*\n• Изолируйте растение\n• Удалите поражённые части\n• Отрегулируйте полив и освещение\n"
 
-        disease_suggestions = result.get("result", {}).get("disease", {}).get("suggestions", [])
-        if disease_suggestions:
-            all_disease_names = [d.get("name", "") for d in disease_suggestions if d.get("name")]
-            unknown_diseases = get_unknown_diseases(all_disease_names)
+    else:
+        text += "✅ *Растение выглядит здоровым!*\n\n💡 *Совет:* Продолжайте регулярный уход и осмотр"
 
-            if unknown_diseases:
-                print(f"🚨 НЕИЗВЕСТНЫЕ БОЛЕЗНИ ДЛЯ СЛОВАРЯ: {unknown_diseases}")
+    return text
 
-            disease = disease_suggestions[0]
-            d_name = disease.get("name", "Неизвестная болезнь")
-            d_prob = round(disease.get("probability", 0) * 100, 1)
 
-            translated_name = DISEASE_TRANSLATIONS.get(d_name.lower(), d_name)
+def _cache_id(photos) -> str:
+    """Ключ кэша: file_unique_id фото или набор file_unique_id альбома"""
+    if len(photos) == 1:
+        return photos[0].file_unique_id
+    return "album:" + ",".join(sorted(photo.file_unique_id for photo in photos))
 
-            description = DISEASE_DESCRIPTIONS.get(d_name.lower(),
-                                                   disease.get("details", {}).get("description", ""))
-            treatment = TREATMENT_RECOMMENDATIONS.get(d_name.lower(),
-                                                      disease.get("details", {}).get("treatment", {}))
 
-            text += f"⚠️ *Обнаружена проблема:* {translated_name} ({d_prob}%)\n\n"
+async def _download(bot, photo):
+    # Фото скачивается в память: у каждого запроса свой буфер, без общего temp.jpg
+    file = await bot.get_file(photo.file_id)
+    return await file.download_as_bytearray()
 
-            if description:
-                text += f"📋 *Описание:* {description}\n\n"
 
-            if treatment:
-                if isinstance(treatment, str):
-                    text += f"💊 *Рекомендации:*\n{treatment}\n"
-                else:
-                    if treatment.get("biological"):
-                        text += "🧪 *Биологическое лечение:* " + ", ".join(treatment["biological"]) + "\n"
-                    if treatment.get("chemical"):
-                        text += "💊 *Химическое лечение:* " + ", ".join(treatment["chemical"]) + "\n"
-            else:
-                text += "💡 *Общие рекомендации:*\n• Изолируйте растение\n• Удалите поражённые части\n• Отрегулируйте полив и освещение\n"
+def _record_unknown_names(parsed: dict):
+    """Отметить болезни и виды из ответа plant.id, которых нет в справочнике"""
+    kb = knowledge_base.snapshot()
+    for disease in parsed["diseases"]:
+        if disease["name"] and disease["name"].lower() not in kb.disease_translations:
+            unknown_names.record(DISEASE, disease["name"], disease["probability"])
+    for species in parsed["species"]:
+        if species["name"] and species["name"].lower() not in kb.plant_translations:
+            unknown_names.record(PLANT, species["name"], species["probability"])
+
+
+async def _diagnose(bot, photos) -> dict:
+    """Разобранный результат для фото (или альбома), которого нет в кэше по file_unique_id
+    (его уже проверил _run_diagnosis): по похожему фото из кэша или из plant.id"""
+    started = time.perf_counter()
+    cache_id = _cache_id(photos)
+
+    originals = await asyncio.gather(*(_download(bot, photo) for photo in photos))
+    # Похожие фото ищутся только для одиночных снимков
+    phash = await perceptual_hash(originals[0]) if len(photos) == 1 else None
+    parsed = await diagnosis_cache.get_by_image(cache_id, phash)
+    if parsed is not None:
+        logger.info(f"📷 Диагностика из кэша: {time.perf_counter() - started:.3f} с")
+        return parsed
+
+    images = await asyncio.gather(*(prepare_image(original) for original in originals))
+    response = await plant_id.identify(images)
+    original_size = sum(len(original) for original in originals)
+    image_size = sum(len(image) for image in images)
+    logger.info(
+        f"📷 Диагностика: {len(photos)} фото, {original_size} -> {image_size} байт "
+        f"(сэкономлено {original_size - image_size}), {time.perf_counter() - started:.2f} с"
+    )
+
+    if not response.is_success:
+        raise plant_id.APIError(response.status_code, response.text)
+
+    parsed = plant_id.parse_identification(response.json())
+    await diagnosis_cache.store(cache_id, phash, parsed)
+
+    _record_unknown_names(parsed)
+
+    return parsed
+
 
+async def diagnose_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not update.message.photo:
+        await update.message.reply_text("📷 Отправьте фото растения для диагностики")
+        return
+
+    media_group_id = update.message.media_group_id
+    if media_group_id is None:
+        await _run_diagnosis(update.message, context.bot, [select_photo_size(update.message.photo)])
+        return
+
+    # Фото альбома приходят отдельными сообщениями: собираем их и диагностируем одним запросом
+    album = _albums.get(media_group_id)
+    if album is None:
+        _albums[media_group_id] = album = []
+        context.application.create_task(_flush_album(media_group_id, context.bot), update=update)
+    album.append(update.message)
+
+
+async def _flush_album(media_group_id, bot):
+    await asyncio.sleep(PHOTO_ALBUM['window_seconds'])
+    messages = sorted(_albums.pop(media_group_id), key=lambda message: message.message_id)
+    photos = [select_photo_size(message.photo) for message in messages[:PHOTO_ALBUM['max_images']]]
+    await _run_diagnosis(messages[0], bot, photos)
+
+
+async def _run_diagnosis(message, bot, photos):
+    """Диагностика через очередь: ответ о постановке в очередь, затем правка его результатом"""
+    cache_id = _cache_id(photos)
+    key = ("diagnosis", cache_id)
+    header = f"📷 *Проанализировано фото:* {len(photos)}\n\n" if len(photos) > 1 else ""
+    status = None
+
+    try:
+        # Повторное фото отвечается из кэша, не занимая место в очереди
+        parsed = await diagnosis_cache.get_by_file(cache_id)
+        if parsed is not None:
+            await message.reply_text(header + render_diagnosis(parsed), parse_mode="Markdown")
+            return
+
+        # Пересланное в несколько чатов фото диагностируется один раз
+        def job():
+            return singleflight.do(key, lambda: _diagnose(bot, photos))
+
+        if key in singleflight:
+            result = asyncio.ensure_future(job())
+            status = await message.reply_text("🔍 Это фото уже анализируется, результат будет здесь...")
         else:
-            text += "✅ *Растение выглядит здоровым!*\n\n💡 *Совет:* Продолжайте регулярный уход и осмотр"
+            try:
+                result, position = diagnosis_queue.submit(job)
+            except QueueFull:
+                await message.reply_text(
+                    "🚦 Сейчас на диагностике слишком много фото.\n\nПожалуйста, отправьте его ещё раз через пару минут."
+                )
+                return
+
+            if position:
+                status = await message.reply_text(f"⏳ Фото в очереди на диагностику, позиция {position}")
+            else:
+                status = await message.reply_text("🔍 Анализируем фото...")
+
+        parsed = await result
+        await status.edit_text(header + render_diagnosis(parsed), parse_mode="Markdown")
 
-        await update.message.reply_text(text, parse_mode="Markdown")
+    except plant_id.APIError as e:
+        await _reply_or_edit(message, status, f"⚠️ Ошибка API ({e.status_code}):\n{e.text}")
 
     except Exception as e:
-        await update.message.reply_text(f"⚠️ Ошибка диагностики: {str(e)}")
\ No newline at end of file
+        await _reply_or_edit(message, status, f"⚠️ Ошибка диагностики: {str(e)}")
+
+
+async def _reply_or_edit(message, status, text: str):
+    if status is not None:
+        await status.edit_text(text)
+    else:
+        await message.reply_text(text)
@@ -1,6 +1,40 @@
+from collections import Counter
+
 from telegram import Update
 from telegram.ext import ContextTypes
+
+from aho_corasick import Automaton
 from config import PLANT_DISEASES
+from handlers.rendering import render_symptom_diagnosis
+from symptom_index import SymptomIndex
+
+# Все симптомы всех болезней в одном автомате: один проход по тексту вместо цикла по словарю
+SYMPTOM_MATCHER = Automaton(
+    (symptom.lower(), disease)
+    for disease, info in PLANT_DISEASES.items()
+    for symptom in info['symptoms']
+)
+
+# Поиск с учётом словоформ и порядка слов ("листья желтеют", "пожелтели листочки")
+SYMPTOM_INDEX = SymptomIndex(PLANT_DISEASES)
+
+DISEASE_ORDER = {disease: index for index, disease in enumerate(PLANT_DISEASES)}
+
+
+def match_symptoms(text: str) -> Counter:
+    """Число найденных в тексте вхождений симптомов по каждой болезни"""
+    return Counter(disease for _, _, disease in SYMPTOM_MATCHER.iter_matches(text.lower()))
+
+
+def rank_diseases(text: str):
+    """Болезни с найденными симптомами по убыванию оценки.
+
+    Оценка - TF-IDF совпавших основ плюс число точных вхождений симптомов.
+    """
+    scores = SYMPTOM_INDEX.search(text)
+    for disease, count in match_symptoms(text).items():
+        scores[disease] = scores.get(disease, 0.0) + count
+    return sorted(scores, key=lambda disease: (-scores[disease], DISEASE_ORDER[disease]))
 
 
 async def diagnose_plant(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -15,25 +49,5 @@ async def diagnose_plant(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def handle_symptoms(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка описания симптомов"""
-    user_text = update.message.text.lower()
-
-    found_diseases = []
-
-    for disease, info in PLANT_DISEASES.items():
-        for symptom in info['symptoms']:
-            if symptom in user_text:
-                found_diseases.append((disease, info))
-                break
-
-    if found_diseases:
-        response = "🔍 *Результаты диагностики:*\n\n"
-
-        for disease_name, disease_info in found_diseases:
-            response += f"*{disease_name.upper()}*\n"
-            response += f"*Возможные причины:* {', '.join(disease_info['causes'])}\n"
-            response += f"*Лечение:* {disease_info['treatment']}\n"
-            response += f"*Профилактика:* {disease_info['prevention']}\n\n"
-    else:
-        response = "❌ Не удалось определить проблему. Опишите симптомы подробнее."
-
+    response = render_symptom_diagnosis(rank_diseases(update.message.text))
     await update.message.reply_text(response, parse_mode='Markdown')
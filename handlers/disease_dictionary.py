@@ -1,6 +1,9 @@
 """
-Словари для перевода болезней растений и рекомендаций по лечению
-Будем пополнять по мере обнаружения новых терминов от plant.id"""
+Словари для перевода болезней растений и рекомендаций по лечению.
+Это начальное наполнение справочника: миграция переносит их в таблицы kb_*,
+а в работе бот читает снимок справочника (knowledge_base) и пополняет БД"""
+import database
+from knowledge_base import knowledge_base
 
 DISEASE_TRANSLATIONS = {
     'senescence': 'естественное старение листьев',
@@ -271,19 +274,18 @@ WATERING_GUIDE = {
 }
 
 def add_new_disease(english_name: str, russian_name: str, description: str = "", treatment: str = ""):
-    """Функция для добавления новых болезней в словарь"""
-    DISEASE_TRANSLATIONS[english_name.lower()] = russian_name
-    if description:
-        DISEASE_DESCRIPTIONS[english_name.lower()] = description
-    if treatment:
-        TREATMENT_RECOMMENDATIONS[english_name.lower()] = treatment
+    """Функция для добавления новых болезней в справочник (в БД)"""
+    database.save_kb_disease(english_name, russian_name, description, treatment)
+    knowledge_base.invalidate()
     print(f"✅ Добавлена болезнь: {english_name} -> {russian_name}")
 
 def add_new_plant(latin_name: str, russian_name: str):
-    """Функция для добавления новых растений в словарь"""
-    PLANT_TRANSLATIONS[latin_name.lower()] = russian_name
+    """Функция для добавления новых растений в справочник (в БД)"""
+    database.save_kb_plant(latin_name, russian_name)
+    knowledge_base.invalidate()
     print(f"✅ Добавлено растение: {latin_name} -> {russian_name}")
 
 def get_unknown_diseases(disease_names: list) -> list:
-    """Получить список болезней, которых нет в словаре"""
-    return [disease for disease in disease_names if disease.lower() not in DISEASE_TRANSLATIONS]
\ No newline at end of file
+    """Получить список болезней, которых нет в справочнике"""
+    translations = knowledge_base.snapshot().disease_translations
+    return [disease for disease in disease_names if disease.lower() not in translations]
\ No newline at end of file
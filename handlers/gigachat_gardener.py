@@ -1,10 +1,15 @@
 import os
-import requests
 import uuid
 import time
-from telegram import Update, ReplyKeyboardMarkup
+
+import httpx
+from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
 
+import http_client
+from handlers.rendering import GARDENER_MENU, MAIN_MENU
+from singleflight import singleflight, fingerprint
+
 GIGACHAT_CREDENTIALS = os.getenv("GIGACHAT_CREDENTIALS")
 
 CHATTING_WITH_GARDENER = range(1)
@@ -15,12 +20,17 @@ token_expires_at = 0
 
 async def get_gigachat_token():
     """Получение токена доступа GigaChat"""
-    global access_token_cache, token_expires_at
-
     current_time = int(time.time())
     if access_token_cache and token_expires_at > current_time:
         return access_token_cache
 
+    # Когда токен истекает, за новым идёт только один запрос
+    return await singleflight.do(("gigachat-token",), _fetch_gigachat_token)
+
+
+async def _fetch_gigachat_token():
+    global access_token_cache, token_expires_at
+
     url = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
 
     headers = {
@@ -35,7 +45,7 @@ async def get_gigachat_token():
     }
 
     try:
-        response = requests.post(url, headers=headers, data=payload, timeout=10, verify=False)
+        response = await http_client.get_client(verify=False).post(url, headers=headers, data=payload, timeout=10)
         response.raise_for_status()
 
         data = response.json()
@@ -51,7 +61,12 @@ async def get_gigachat_token():
 
 
 async def get_gigachat_response(question: str) -> str:
-    """Получение ответа от GigaChat"""
+    """Получение ответа от GigaChat; одинаковые одновременные вопросы задаются один раз"""
+    key = ("gigachat", fingerprint(" ".join(question.lower().split())))
+    return await singleflight.do(key, lambda: _get_gigachat_response(question))
+
+
+async def _get_gigachat_response(question: str) -> str:
     token = await get_gigachat_token()
     if not token:
         return "❌ *Ошибка подключения к AI-консультанту*\n\nПопробуйте позже или используйте другие функции бота."
@@ -93,7 +108,7 @@ async def get_gigachat_response(question: str) -> str:
     }
 
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=30, verify=False)
+        response = await http_client.get_client(verify=False).post(url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
 
         result = response.json()
@@ -101,10 +116,10 @@ async def get_gigachat_response(question: str) -> str:
 
         return answer
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         return "⏰ *Время ожидания истекло*\n\nAI-консультант не успел обработать запрос. Попробуйте задать вопрос короче или повторите позже."
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return f"❌ *Ошибка связи с AI-консультантом*\n\nТехническая информация: {str(e)}"
 
     except Exception as e:
@@ -144,7 +159,7 @@ async def start_gardener_chat(update: Update, context: ContextTypes.DEFAULT_TYPE
         "• Как ухаживать за суккулентами зимой?\n\n"
         "Задайте ваш вопрос о растениях 👇",
         parse_mode="Markdown",
-        reply_markup=ReplyKeyboardMarkup([["⬅️ Выйти из чата"]], resize_keyboard=True)
+        reply_markup=GARDENER_MENU
     )
     return CHATTING_WITH_GARDENER
 
@@ -163,7 +178,7 @@ async def handle_gardener_question(update: Update, context: ContextTypes.DEFAULT
     await update.message.reply_text(
         response,
         parse_mode="Markdown",
-        reply_markup=ReplyKeyboardMarkup([["⬅️ Выйти из чата"]], resize_keyboard=True)
+        reply_markup=GARDENER_MENU
     )
 
     return CHATTING_WITH_GARDENER
@@ -171,14 +186,12 @@ async def handle_gardener_question(update: Update, context: ContextTypes.DEFAULT
 
 async def end_gardener_chat(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Завершение чата"""
-    from handlers.start import MAIN_KEYBOARD
-
     await update.message.reply_text(
         "👨‍🌾 *Был рад помочь!*\n\n"
         "Возвращайтесь с любыми вопросами о ваших растениях! 🌿\n"
         "Также можете использовать другие функции бота:",
         parse_mode="Markdown",
-        reply_markup=ReplyKeyboardMarkup(MAIN_KEYBOARD, resize_keyboard=True)
+        reply_markup=MAIN_MENU
     )
     return ConversationHandler.END
 
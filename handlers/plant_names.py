@@ -0,0 +1,82 @@
+"""Распознавание названий растений в справочниках ухода, полива и переводов.
+
+Для каждого справочника строится NameIndex по ключам, синонимам и латинским
+названиям из переводов растений, чей русский перевод указывает на ключ
+(ficus elastica -> "Фикус каучуконосный" -> "фикус"). Индексы строятся по снимку
+справочника (knowledge_base) и перестраиваются при смене его версии.
+"""
+from knowledge_base import knowledge_base
+from name_index import NameIndex
+from handlers.rendering import GENERAL_CARE_INFO, PLANT_CARE_INFO
+
+# Другие названия -> ключ справочников ухода и полива
+SYNONYMS = {
+    'алоэ': 'алое',
+    'крассула': 'толстянка',
+    'денежное дерево': 'толстянка',
+    'сенполия': 'фиалка',
+    'пеларгония': 'герань',
+    'щучий хвост': 'сансевиерия',
+    'тещин язык': 'сансевиерия',
+    'нефролепис': 'папоротник',
+    'фаленопсис': 'орхидея',
+    'долларовое дерево': 'замиокулькас',
+    'женское счастье': 'спатифиллум',
+    'мужское счастье': 'антуриум',
+    'финиковая пальма': 'финик',
+    'кофейное дерево': 'кофе',
+}
+
+
+def build_name_index(mapping: dict, plant_translations: dict) -> NameIndex:
+    """Индекс названий для справочника с русскими ключами"""
+    names = [(key, key) for key in mapping]
+    names += [(synonym, key) for synonym, key in SYNONYMS.items() if key in mapping]
+
+    russian = NameIndex(names)
+    for latin_name, russian_name in plant_translations.items():
+        key = russian.find(russian_name)
+        if key is not None:
+            names.append((latin_name, key))
+    return NameIndex(names)
+
+
+class _Indexes:
+    """Индексы названий для одной версии справочника"""
+
+    def __init__(self, kb):
+        self.version = kb.version
+        self.care = build_name_index(PLANT_CARE_INFO, kb.plant_translations)
+        self.watering = build_name_index(kb.watering_guide, kb.plant_translations)
+        self.latin = NameIndex((name, name) for name in kb.plant_translations)
+
+
+_indexes = None
+
+
+def _current(kb) -> _Indexes:
+    # Справочник мог обновиться (в том числе другим процессом): индексы перестраиваются по версии
+    global _indexes
+    if _indexes is None or _indexes.version != kb.version:
+        _indexes = _Indexes(kb)
+    return _indexes
+
+
+def get_basic_care_info(plant_name: str) -> str:
+    """Базовая информация по уходу за популярными растениями"""
+    key = _current(knowledge_base.snapshot()).care.find(plant_name)
+    return PLANT_CARE_INFO[key] if key is not None else GENERAL_CARE_INFO
+
+
+def get_watering_guide(plant_name: str):
+    """Совет по поливу для растения или None"""
+    kb = knowledge_base.snapshot()
+    key = _current(kb).watering.find(plant_name)
+    return kb.watering_guide[key] if key is not None else None
+
+
+def translate_plant_name(latin_name: str) -> str:
+    """Русское название по латинскому (точному или самому длинному совпадающему, например роду)"""
+    kb = knowledge_base.snapshot()
+    key = _current(kb).latin.find(latin_name)
+    return kb.plant_translations[key] if key is not None else latin_name
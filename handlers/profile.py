@@ -6,7 +6,7 @@ from telegram.ext import (
     CallbackQueryHandler,
     filters,
 )
-from database import (
+from async_database import (
     upsert_user,
     add_plant,
     list_plants,
@@ -15,6 +15,8 @@ from database import (
     set_watering_schedule,
     mark_watered
 )
+from handlers.plant_names import get_basic_care_info, get_watering_guide
+from handlers.rendering import ADD_PLANT_KEYBOARD, WATERING_INTERVAL_KEYBOARD
 
 ADD_NAME, SET_WATERING_INTERVAL = range(2)
 
@@ -22,18 +24,17 @@ ADD_NAME, SET_WATERING_INTERVAL = range(2)
 async def my_plants(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показать список растений пользователя"""
     user = update.effective_user
-    user_id = upsert_user(
+    user_id = await upsert_user(
         chat_id=update.effective_chat.id,
         username=user.username,
         first_name=user.first_name,
         last_name=user.last_name,
     )
 
-    plants = list_plants(user_id)
+    plants = await list_plants(user_id)
     if not plants:
         text = "🌱 *У вас пока нет растений*\n\nДобавьте первое растение с помощью кнопки ниже 👇"
-        keyboard = [[InlineKeyboardButton("➕ Добавить растение", callback_data="add_plant")]]
-        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=InlineKeyboardMarkup(keyboard))
+        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=ADD_PLANT_KEYBOARD)
         return
 
     text = "🌿 *Мои растения:*\n\n"
@@ -72,13 +73,13 @@ async def add_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     plant_name = update.message.text.strip()
 
     user = update.effective_user
-    user_id = upsert_user(
+    user_id = await upsert_user(
         chat_id=update.effective_chat.id,
         username=user.username,
         first_name=user.first_name,
         last_name=user.last_name,
     )
-    plant_id = add_plant(user_id=user_id, name=plant_name)
+    plant_id = await add_plant(user_id=user_id, name=plant_name)
 
     care_text = get_basic_care_info(plant_name)
 
@@ -89,52 +90,13 @@ async def add_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
-def get_basic_care_info(plant_name: str) -> str:
-    """Базовая информация по уходу за популярными растениями"""
-    plant_name_lower = plant_name.lower()
-
-    care_info = {
-        "фикус": "💧 *Полив:* умеренный, когда верхний слой почвы подсохнет\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* регулярное опрыскивание, протирание листьев",
-        "монстера": "💧 *Полив:* обильный, но давайте почве просыхать\n☀️ *Свет:* полутень или рассеянный свет\n🌡️ *Температура:* 20-25°C\n🌿 *Уход:* опрыскивание, поддержка для роста",
-        "орхидея": "💧 *Полив:* умеренный, методом погружения\n☀️ *Свет:* яркий рассеянный, без прямого солнца\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* специальный субстрат для орхидей",
-        "кактус": "💧 *Полив:* редкий, зимой почти не поливать\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 20-30°C летом, 10-15°C зимой\n🌿 *Уход:* хорошо дренированная почва",
-        "суккулент": "💧 *Полив:* умеренный, давайте почве полностью просохнуть\n☀️ *Свет:* яркий прямой\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* песчаная почва, хороший дренаж",
-        "алое": "💧 *Полив:* умеренный, зимой реже\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* не требует частого ухода",
-        "сансевиерия": "💧 *Полив:* редкий, очень устойчива к засухе\n☀️ *Свет:* любой, от тени до яркого света\n🌡️ *Температура:* 15-25°C\n🌿 *Уход:* идеальное растение для начинающих",
-        "спатифиллум": "💧 *Полив:* обильный, любит влажность\n☀️ *Свет:* полутень\n🌡️ *Температура:* 18-23°C\n🌿 *Уход:* регулярное опрыскивание, подкормки для цветения",
-        "замиокулькас": "💧 *Полив:* очень редкий\n☀️ *Свет:* любой, переносит тень\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* устойчив к засухе и плохому освещению",
-        "хлорофитум": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* быстро растет, очищает воздух",
-        "драцена": "💧 *Полив:* умеренный\n☀️ *Свет:* рассеянный, переносит полутень\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* боится сквозняков, опрыскивание",
-        "фиалка": "💧 *Полив:* через поддон, не мочить листья\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* маленькие горшки, специальный грунт",
-        "герань": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* регулярные подкормки, обрезка",
-        "бегония": "💧 *Полив:* умеренный, не переливать\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* высокая влажность, но без опрыскивания листьев",
-        "папоротник": "💧 *Полив:* обильный, не допускать пересыхания\n☀️ *Свет:* полутень\n🌡️ *Температура:* 18-20°C\n🌿 *Уход:* высокая влажность, регулярное опрыскивание",
-        "толстянка": "💧 *Полив:* умеренный, давать почве просохнуть\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* денежное дерево, неприхотливо",
-        "финик": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 20-25°C\n🌿 *Уход:* пальма, медленно растет",
-        "антуриум": "💧 *Полив:* умеренный, мягкой водой\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 20-25°C\n🌿 *Уход:* высокая влажность, цветет круглый год",
-        "гиппеаструм": "💧 *Полив:* умеренный, зимой период покоя\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-23°C\n🌿 *Уход:* луковичное растение, красивое цветение",
-        "розмарин": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* ароматная трава, любит свежий воздух",
-        "мята": "💧 *Полив:* обильный\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* быстро разрастается, ароматные листья",
-        "лавр": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* лавровый лист, можно формировать крону",
-        "лимон": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* цитрусовое дерево, требует подкормок",
-        "кофе": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-24°C\n🌿 *Уход:* кофейное дерево, боится сквозняков",
-        "мирт": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-23°C\n🌿 *Уход:* ароматные листья, можно формировать бонсай"
-    }
-
-    for key, info in care_info.items():
-        if key in plant_name_lower:
-            return info
-
-    return "💡 *Общие рекомендации:*\n• Полив: когда верхний слой почвы подсох\n• Свет: яркий рассеянный\n• Температура: 18-25°C\n• Удобрения: весной и летом\n\nДля точной диагностика используйте функцию 🔍 Диагностика"
-
-
 async def delete_plant_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Удаление растения"""
     query = update.callback_query
     await query.answer()
     if query.data.startswith("delete_"):
         plant_id = int(query.data.split("_")[1])
-        delete_plant(plant_id)
+        await delete_plant(plant_id)
         await query.edit_message_text("✅ *Растение удалено*\n\nОбновите список командой /myplants",
                                       parse_mode="Markdown")
 
@@ -148,7 +110,7 @@ async def setup_reminders_cb(update: Update, context: ContextTypes.DEFAULT_TYPE)
         plant_id = int(query.data.split("_")[1])
         context.user_data['setup_plant_id'] = plant_id
 
-        plant = get_plant(plant_id)
+        plant = await get_plant(plant_id)
         if plant:
             pid, user_id, name, type_, photo, freq, last_watered, created = plant
 
@@ -157,19 +119,14 @@ async def setup_reminders_cb(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 f"Как часто нужно поливать это растение?\n"
                 f"Выберите интервал или введите своё значение:"
             )
-
-            keyboard = [
-                [InlineKeyboardButton("💧 Каждый день", callback_data="interval_1")],
-                [InlineKeyboardButton("💧 Каждые 3 дня", callback_data="interval_3")],
-                [InlineKeyboardButton("💧 Раз в неделю", callback_data="interval_7")],
-                [InlineKeyboardButton("💧 Раз в 2 недели", callback_data="interval_14")],
-                [InlineKeyboardButton("📝 Ввести свой интервал", callback_data="custom_interval")]
-            ]
+            guide = get_watering_guide(name)
+            if guide:
+                text += f"\n\n💡 *Совет по поливу:* {guide}"
 
             await query.message.reply_text(
                 text,
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=WATERING_INTERVAL_KEYBOARD
             )
             return SET_WATERING_INTERVAL
 
@@ -184,8 +141,8 @@ async def handle_interval_selection(update: Update, context: ContextTypes.DEFAUL
         plant_id = context.user_data.get('setup_plant_id')
 
         if plant_id:
-            set_watering_schedule(plant_id, interval)
-            plant = get_plant(plant_id)
+            await set_watering_schedule(plant_id, interval)
+            plant = await get_plant(plant_id)
 
             await query.message.reply_text(
                 f"✅ *Напоминания настроены!*\n\n"
@@ -216,8 +173,8 @@ async def handle_custom_interval_input(update: Update, context: ContextTypes.DEF
 
         plant_id = context.user_data.get('setup_plant_id')
         if plant_id:
-            set_watering_schedule(plant_id, interval)
-            plant = get_plant(plant_id)
+            await set_watering_schedule(plant_id, interval)
+            plant = await get_plant(plant_id)
 
             await update.message.reply_text(
                 f"✅ *Напоминания настроены!*\n\n"
@@ -1,12 +1,9 @@
-from telegram import Update, ReplyKeyboardMarkup
+from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler, MessageHandler, filters
 
-SEASON, PLANT_TYPE = range(2)
+from handlers.rendering import BACK_MENU, MAIN_MENU, SEASON_MENU
 
-SEASON_KEYBOARD = [
-    ["🌱 Весна", "☀️ Лето"],
-    ["🍂 Осень", "❄️ Зима"]
-]
+SEASON, PLANT_TYPE = range(2)
 
 SEASONAL_RECOMMENDATIONS = {
     "весна": {
@@ -94,13 +91,29 @@ SEASONAL_RECOMMENDATIONS = {
     }
 }
 
+SEASON_ALIASES = {
+    "🌱 весна": "весна",
+    "весна": "весна",
+    "☀️ лето": "лето",
+    "лето": "лето",
+    "🍂 осень": "осень",
+    "осень": "осень",
+    "❄️ зима": "зима",
+    "зима": "зима"
+}
+
+SEASON_RESPONSES = {
+    season: f"{recommendations['title']}\n\n{recommendations['recommendations']}"
+    for season, recommendations in SEASONAL_RECOMMENDATIONS.items()
+}
+
 
 async def start_seasonal_recommendations(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Начало диалога выбора сезона"""
     await update.message.reply_text(
         "🌿 *Выберите текущее время года:*",
         parse_mode='Markdown',
-        reply_markup=ReplyKeyboardMarkup(SEASON_KEYBOARD, one_time_keyboard=True, resize_keyboard=True)
+        reply_markup=SEASON_MENU
     )
     return SEASON
 
@@ -109,35 +122,21 @@ async def handle_season_choice(update: Update, context: ContextTypes.DEFAULT_TYP
     """Обработка выбора сезона"""
     user_input = update.message.text.lower()
 
-    season_map = {
-        "🌱 весна": "весна",
-        "весна": "весна",
-        "☀️ лето": "лето",
-        "лето": "лето",
-        "🍂 осень": "осень",
-        "осень": "осень",
-        "❄️ зима": "зима",
-        "зима": "зима"
-    }
-
-    season = season_map.get(user_input)
+    season = SEASON_ALIASES.get(user_input)
 
     if not season:
         await update.message.reply_text(
             "❌ Пожалуйста, выберите время года из предложенных вариантов:",
-            reply_markup=ReplyKeyboardMarkup(SEASON_KEYBOARD, one_time_keyboard=True, resize_keyboard=True)
+            reply_markup=SEASON_MENU
         )
         return SEASON
 
     context.user_data['season'] = season
-    recommendations = SEASONAL_RECOMMENDATIONS[season]
-
-    response = f"{recommendations['title']}\n\n{recommendations['recommendations']}"
 
     await update.message.reply_text(
-        response,
+        SEASON_RESPONSES[season],
         parse_mode='Markdown',
-        reply_markup=ReplyKeyboardMarkup([["⬅️ Назад"]], resize_keyboard=True)
+        reply_markup=BACK_MENU
     )
 
     return ConversationHandler.END
@@ -147,11 +146,7 @@ async def cancel_recommendations(update: Update, context: ContextTypes.DEFAULT_T
     """Отмена диалога"""
     await update.message.reply_text(
         "Возвращаюсь в главное меню!",
-        reply_markup=ReplyKeyboardMarkup([
-            ["🌱 Мои растения", "🔍 Диагностика"],
-            ["📚 Рекомендации", "🌍 Поиск растений"],
-            ["👨‍🌾 Чат с агрономом"]
-        ], resize_keyboard=True)
+        reply_markup=MAIN_MENU
     )
     return ConversationHandler.END
 
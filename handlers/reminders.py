@@ -1,6 +1,23 @@
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import get_plants_needing_watering, mark_watered
+from async_database import (
+    get_plants_needing_watering,
+    mark_watered,
+    mark_watered_many,
+    record_reminders_sent,
+    get_overdue_plants,
+    get_digest_chat_ids,
+    toggle_reminder_digest
+)
+from config import WATERING_REMINDERS
+from send_queue import send_queue
+from watering_scheduler import scheduler
+
+DIGEST_PAGE_SIZE = 8
 
 
 async def send_manual_reminder(bot, chat_id, plant_name, plant_id):
@@ -23,14 +40,95 @@ async def send_manual_reminder(bot, chat_id, plant_name, plant_id):
     )
 
 
+def build_digest(plants, page=0):
+    """Текст и клавиатура сводного напоминания для страницы page"""
+    pages = max(1, (len(plants) + DIGEST_PAGE_SIZE - 1) // DIGEST_PAGE_SIZE)
+    page = min(max(page, 0), pages - 1)
+    page_plants = plants[page * DIGEST_PAGE_SIZE:(page + 1) * DIGEST_PAGE_SIZE]
+
+    text = f"💧 *Пора полить растения ({len(plants)})!*\n\n"
+    text += "\n".join(f"• {name}" for _, name in page_plants)
+    text += "\n\nОтмечайте политые растения кнопками ниже 👇"
+
+    keyboard = [
+        [InlineKeyboardButton(f"✅ {name}", callback_data=f"digest_w_{plant_id}_{page}")]
+        for plant_id, name in page_plants
+    ]
+
+    if pages > 1:
+        navigation = []
+        if page > 0:
+            navigation.append(InlineKeyboardButton("⬅️", callback_data=f"digest_p_{page - 1}"))
+        navigation.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data="digest_noop"))
+        if page < pages - 1:
+            navigation.append(InlineKeyboardButton("➡️", callback_data=f"digest_p_{page + 1}"))
+        keyboard.append(navigation)
+
+    keyboard.append([InlineKeyboardButton("✅ Полил(а) все", callback_data="digest_all")])
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+async def send_reminder_digest(bot, chat_id, plants):
+    """Одно сообщение со всеми растениями чата, которые пора полить"""
+    text, reply_markup = build_digest(plants)
+    await bot.send_message(
+        chat_id=chat_id,
+        text=text,
+        parse_mode="Markdown",
+        reply_markup=reply_markup
+    )
+
+
+def retry_reminders(plant_ids):
+    """Вернуть в расписание растения, напоминание о которых не удалось отправить"""
+    retry_at = datetime.utcnow() + timedelta(minutes=WATERING_REMINDERS['retry_minutes'])
+    for plant_id in plant_ids:
+        scheduler.snooze(plant_id, retry_at)
+
+
+async def dispatch_reminders(bot, plants):
+    """Поставить напоминания в очередь отправки.
+
+    Для чатов со сводным режимом несколько растений объединяются в одно сообщение:
+    к наступившим срокам добавляются растения чата из планировщика, срок которых
+    наступит в ближайшие WATERING_REMINDERS['digest_window_minutes'] минут, чтобы
+    растения с немного разными сроками не приходили отдельными сообщениями.
+    Возвращает список (plant_ids, chat_id, future).
+    """
+    by_chat = {}
+    for plant in plants:
+        plant_id, name, chat_id = plant[0], plant[1], plant[4]
+        by_chat.setdefault(chat_id, []).append((plant_id, name))
+
+    digest_chats = await get_digest_chat_ids(list(by_chat))
+    until = datetime.utcnow() + timedelta(minutes=WATERING_REMINDERS['digest_window_minutes'])
+    for plant in scheduler.pop_chat_due(digest_chats, until):
+        chat_plants = by_chat[plant[4]]
+        if all(plant_id != plant[0] for plant_id, _ in chat_plants):
+            chat_plants.append((plant[0], plant[1]))
+
+    deliveries = []
+    for chat_id, chat_plants in by_chat.items():
+        if chat_id in digest_chats and len(chat_plants) > 1:
+            future = send_queue.submit(chat_id, partial(send_reminder_digest, bot, chat_id, chat_plants))
+            deliveries.append(([plant_id for plant_id, _ in chat_plants], chat_id, future))
+            continue
+
+        for plant_id, name in chat_plants:
+            future = send_queue.submit(chat_id, partial(send_manual_reminder, bot, chat_id, name, plant_id))
+            deliveries.append(([plant_id], chat_id, future))
+
+    return deliveries
+
+
 async def handle_watered_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработка нажатия кнопки 'Полил(а)'"""
+    """Обработка нажатия кнопки 'Полил(а)' (mark_watered сбрасывает состояние напоминаний)"""
     query = update.callback_query
     await query.answer()
 
     if query.data.startswith("watered_"):
         plant_id = int(query.data.split("_")[1])
-        mark_watered(plant_id)
+        await mark_watered(plant_id)
 
         await query.edit_message_text(
             "✅ *Отлично! Растение полито.*\n\n"
@@ -39,23 +137,77 @@ async def handle_watered_callback(update: Update, context: ContextTypes.DEFAULT_
         )
 
 
+async def handle_digest_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Кнопки сводного напоминания: полив одного растения, всех сразу и листание страниц"""
+    query = update.callback_query
+    await query.answer()
+
+    if query.data == "digest_noop":
+        return
+
+    chat_id = update.effective_chat.id
+    parts = query.data.split("_")
+    page = 0
+
+    if parts[1] == "all":
+        plants = await get_overdue_plants(chat_id)
+        await mark_watered_many([plant_id for plant_id, _ in plants])
+        await query.edit_message_text(
+            f"✅ *Отлично! Полито растений: {len(plants)}.*\n\n"
+            "Напоминания сброшены.",
+            parse_mode="Markdown"
+        )
+        return
+
+    if parts[1] == "w":
+        await mark_watered(int(parts[2]))
+        page = int(parts[3])
+    elif parts[1] == "p":
+        page = int(parts[2])
+
+    plants = await get_overdue_plants(chat_id)
+    if not plants:
+        await query.edit_message_text(
+            "✅ *Все растения политы!*\n\n"
+            "Напоминания сброшены.",
+            parse_mode="Markdown"
+        )
+        return
+
+    text, reply_markup = build_digest(plants, page)
+    await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+
+
+async def digest_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Включение/выключение сводных напоминаний (/digest)"""
+    if await toggle_reminder_digest(update.effective_chat.id):
+        text = "📬 *Сводные напоминания включены*\n\nРастения, которые пора полить, придут одним сообщением."
+    else:
+        text = "📨 *Сводные напоминания выключены*\n\nПо каждому растению будет приходить отдельное напоминание."
+    await update.message.reply_text(text, parse_mode="Markdown")
+
+
 async def check_reminders_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Ручная проверка напоминаний (/check_reminders)"""
-    plants = get_plants_needing_watering()
+    plants = await get_plants_needing_watering()
 
     if not plants:
         await update.message.reply_text("✅ Все растения политы вовремя!")
         return
 
-    bot = context.bot
-    reminder_count = 0
+    deliveries = await dispatch_reminders(context.bot, plants)
+    results = await asyncio.gather(*(future for _, _, future in deliveries), return_exceptions=True)
 
-    for plant in plants:
-        plant_id, name, interval, last_watered, chat_id = plant
-        try:
-            await send_manual_reminder(bot, chat_id, name, plant_id)
+    sent_ids = []
+    reminder_count = 0
+    for (plant_ids, chat_id, _), result in zip(deliveries, results):
+        if isinstance(result, Exception):
+            print(f"❌ Ошибка отправки напоминания в чат {chat_id}: {result}")
+            retry_reminders(plant_ids)
+        else:
+            sent_ids.extend(plant_ids)
             reminder_count += 1
-        except Exception as e:
-            print(f"❌ Ошибка отправки напоминания для {name}: {e}")
+
+    await record_reminders_sent(sent_ids)
 
     await update.message.reply_text(f"📨 Отправлено {reminder_count} напоминаний")
\ No newline at end of file
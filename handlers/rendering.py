@@ -0,0 +1,84 @@
+"""Заранее собранные фрагменты ответов и клавиатуры для статического содержимого.
+
+Тексты по болезням и растениям и объекты клавиатур создаются один раз при импорте,
+обработчики только склеивают готовые куски.
+"""
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
+
+from config import PLANT_DISEASES
+
+MAIN_KEYBOARD = [
+    ["🌱 Мои растения", "🔍 Диагностика"],
+    ["📚 Рекомендации", "🌍 Поиск растений"],
+    ["👨‍🌾 Чат с агрономом"]
+]
+
+SEASON_KEYBOARD = [
+    ["🌱 Весна", "☀️ Лето"],
+    ["🍂 Осень", "❄️ Зима"]
+]
+
+MAIN_MENU = ReplyKeyboardMarkup(MAIN_KEYBOARD, resize_keyboard=True)
+BACK_MENU = ReplyKeyboardMarkup([["⬅️ Назад"]], resize_keyboard=True)
+SEASON_MENU = ReplyKeyboardMarkup(SEASON_KEYBOARD, one_time_keyboard=True, resize_keyboard=True)
+GARDENER_MENU = ReplyKeyboardMarkup([["⬅️ Выйти из чата"]], resize_keyboard=True)
+SEARCH_RESULT_MENU = ReplyKeyboardMarkup([["🔍 Найти другое растение", "⬅️ Назад"]], resize_keyboard=True)
+
+ADD_PLANT_KEYBOARD = InlineKeyboardMarkup([[InlineKeyboardButton("➕ Добавить растение", callback_data="add_plant")]])
+WATERING_INTERVAL_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("💧 Каждый день", callback_data="interval_1")],
+    [InlineKeyboardButton("💧 Каждые 3 дня", callback_data="interval_3")],
+    [InlineKeyboardButton("💧 Раз в неделю", callback_data="interval_7")],
+    [InlineKeyboardButton("💧 Раз в 2 недели", callback_data="interval_14")],
+    [InlineKeyboardButton("📝 Ввести свой интервал", callback_data="custom_interval")]
+])
+
+SYMPTOMS_HEADER = "🔍 *Результаты диагностики:*\n\n"
+SYMPTOMS_NOT_FOUND = "❌ Не удалось определить проблему. Опишите симптомы подробнее."
+
+DISEASE_FRAGMENTS = {
+    disease: (
+        f"*{disease.upper()}*\n"
+        f"*Возможные причины:* {', '.join(info['causes'])}\n"
+        f"*Лечение:* {info['treatment']}\n"
+        f"*Профилактика:* {info['prevention']}\n\n"
+    )
+    for disease, info in PLANT_DISEASES.items()
+}
+
+PLANT_CARE_INFO = {
+    "фикус": "💧 *Полив:* умеренный, когда верхний слой почвы подсохнет\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* регулярное опрыскивание, протирание листьев",
+    "монстера": "💧 *Полив:* обильный, но давайте почве просыхать\n☀️ *Свет:* полутень или рассеянный свет\n🌡️ *Температура:* 20-25°C\n🌿 *Уход:* опрыскивание, поддержка для роста",
+    "орхидея": "💧 *Полив:* умеренный, методом погружения\n☀️ *Свет:* яркий рассеянный, без прямого солнца\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* специальный субстрат для орхидей",
+    "кактус": "💧 *Полив:* редкий, зимой почти не поливать\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 20-30°C летом, 10-15°C зимой\n🌿 *Уход:* хорошо дренированная почва",
+    "суккулент": "💧 *Полив:* умеренный, давайте почве полностью просохнуть\n☀️ *Свет:* яркий прямой\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* песчаная почва, хороший дренаж",
+    "алое": "💧 *Полив:* умеренный, зимой реже\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* не требует частого ухода",
+    "сансевиерия": "💧 *Полив:* редкий, очень устойчива к засухе\n☀️ *Свет:* любой, от тени до яркого света\n🌡️ *Температура:* 15-25°C\n🌿 *Уход:* идеальное растение для начинающих",
+    "спатифиллум": "💧 *Полив:* обильный, любит влажность\n☀️ *Свет:* полутень\n🌡️ *Температура:* 18-23°C\n🌿 *Уход:* регулярное опрыскивание, подкормки для цветения",
+    "замиокулькас": "💧 *Полив:* очень редкий\n☀️ *Свет:* любой, переносит тень\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* устойчив к засухе и плохому освещению",
+    "хлорофитум": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* быстро растет, очищает воздух",
+    "драцена": "💧 *Полив:* умеренный\n☀️ *Свет:* рассеянный, переносит полутень\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* боится сквозняков, опрыскивание",
+    "фиалка": "💧 *Полив:* через поддон, не мочить листья\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* маленькие горшки, специальный грунт",
+    "герань": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* регулярные подкормки, обрезка",
+    "бегония": "💧 *Полив:* умеренный, не переливать\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* высокая влажность, но без опрыскивания листьев",
+    "папоротник": "💧 *Полив:* обильный, не допускать пересыхания\n☀️ *Свет:* полутень\n🌡️ *Температура:* 18-20°C\n🌿 *Уход:* высокая влажность, регулярное опрыскивание",
+    "толстянка": "💧 *Полив:* умеренный, давать почве просохнуть\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* денежное дерево, неприхотливо",
+    "финик": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 20-25°C\n🌿 *Уход:* пальма, медленно растет",
+    "антуриум": "💧 *Полив:* умеренный, мягкой водой\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 20-25°C\n🌿 *Уход:* высокая влажность, цветет круглый год",
+    "гиппеаструм": "💧 *Полив:* умеренный, зимой период покоя\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-23°C\n🌿 *Уход:* луковичное растение, красивое цветение",
+    "розмарин": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* ароматная трава, любит свежий воздух",
+    "мята": "💧 *Полив:* обильный\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-22°C\n🌿 *Уход:* быстро разрастается, ароматные листья",
+    "лавр": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* лавровый лист, можно формировать крону",
+    "лимон": "💧 *Полив:* умеренный\n☀️ *Свет:* максимально яркий\n🌡️ *Температура:* 18-25°C\n🌿 *Уход:* цитрусовое дерево, требует подкормок",
+    "кофе": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий рассеянный\n🌡️ *Температура:* 18-24°C\n🌿 *Уход:* кофейное дерево, боится сквозняков",
+    "мирт": "💧 *Полив:* умеренный\n☀️ *Свет:* яркий\n🌡️ *Температура:* 18-23°C\n🌿 *Уход:* ароматные листья, можно формировать бонсай"
+}
+
+GENERAL_CARE_INFO = "💡 *Общие рекомендации:*\n• Полив: когда верхний слой почвы подсох\n• Свет: яркий рассеянный\n• Температура: 18-25°C\n• Удобрения: весной и летом\n\nДля точной диагностика используйте функцию 🔍 Диагностика"
+
+
+def render_symptom_diagnosis(diseases) -> str:
+    """Ответ на описание симптомов из готовых фрагментов по болезням"""
+    if not diseases:
+        return SYMPTOMS_NOT_FOUND
+    return SYMPTOMS_HEADER + "".join(DISEASE_FRAGMENTS[disease] for disease in diseases)
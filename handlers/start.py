@@ -1,18 +1,9 @@
-from telegram import Update, ReplyKeyboardMarkup
+from telegram import Update
 from telegram.ext import ContextTypes
 
-MAIN_KEYBOARD = [
-    ["🌱 Мои растения", "🔍 Диагностика"],
-    ["📚 Рекомендации", "🌍 Поиск растений"],
-    ["👨‍🌾 Чат с агрономом"]
-]
+from handlers.rendering import MAIN_MENU
 
-
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработчик команды /start"""
-    reply_markup = ReplyKeyboardMarkup(MAIN_KEYBOARD, resize_keyboard=True)
-
-    welcome_text = """
+WELCOME_TEXT = """
 🌿 *Добро пожаловать в DoctorWood!*
 
 Я помогу вам:
@@ -22,17 +13,9 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 • 👨‍🌾 Получить консультацию агронома
 
 *Выберите действие кнопками ниже:* 👇
-    """
-    await update.message.reply_text(
-        welcome_text,
-        parse_mode='Markdown',
-        reply_markup=reply_markup
-    )
-
+"""
 
-async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработчик команды /help"""
-    help_text = """
+HELP_TEXT = """
 *Как пользоваться ботом:*
 
 • 🌱 *Мои растения* - добавьте растения для персонализированных советов
@@ -42,15 +25,28 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 • 👨‍🌾 *Чат с агрономом* - консультация специалиста
 
 /start - главное меню
-    """
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+/digest - сводные напоминания о поливе (вкл/выкл)
+"""
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /start"""
+    await update.message.reply_text(
+        WELCOME_TEXT,
+        parse_mode='Markdown',
+        reply_markup=MAIN_MENU
+    )
+
+
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /help"""
+    await update.message.reply_text(HELP_TEXT, parse_mode='Markdown')
 
 
 async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Возврат в главное меню"""
-    reply_markup = ReplyKeyboardMarkup(MAIN_KEYBOARD, resize_keyboard=True)
     await update.message.reply_text(
         "↩️ *Возврат в главное меню*",
         parse_mode='Markdown',
-        reply_markup=reply_markup
-    )
\ No newline at end of file
+        reply_markup=MAIN_MENU
+    )
@@ -1,15 +1,23 @@
+import json
 import os
-import requests
 import logging
-from telegram import Update, ReplyKeyboardMarkup
+
+import httpx
+from telegram import Update
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
     MessageHandler,
     filters,
 )
-from deep_translator import GoogleTranslator
 
+import async_database
+import http_client
+from name_index import normalize_name
+from singleflight import singleflight
+from trefle_cache import trefle_cache
+from translation_memo import translation_memo
+from handlers.rendering import BACK_MENU, SEARCH_RESULT_MENU
 from handlers.start import back_to_main
 
 logger = logging.getLogger(__name__)
@@ -36,15 +44,75 @@ def detect_language(plant_name):
         return 'latin'
 
 
-def translate_to_latin(russian_name):
-    """Перевод русского названия на латынь"""
+async def translate_to_latin(russian_name):
+    """Перевод русского названия на латынь (известные названия - без обращения к переводчику)"""
+    return await translation_memo.translate(russian_name)
+
+
+async def trefle_get(path: str, params: dict = None, timeout: float = 10):
+    """GET к Trefle API; одновременные одинаковые запросы выполняются один раз"""
+    params = params or {}
+    key = ("trefle", path, tuple(sorted(params.items())))
+    return await singleflight.do(key, lambda: http_client.get_client().get(
+        f"{TREFLE_BASE_URL}{path}", params={**params, 'token': TREFLE_API_KEY}, timeout=timeout
+    ))
+
+
+class TrefleError(Exception):
+    """Trefle вернул ошибку"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Trefle {status_code}")
+        self.status_code = status_code
+
+
+async def search_plants(search_query: str) -> list:
+    """Результаты поиска Trefle (через кэш по нормализованному запросу)"""
+    async def fetch():
+        response = await trefle_get("/plants/search", {'q': search_query}, timeout=15)
+        if not response.is_success:
+            raise TrefleError(response.status_code)
+        return response.json().get("data", [])
+
+    return await trefle_cache.get(f"search:{normalize_name(search_query)}", fetch)
+
+
+async def get_species(species_id) -> dict:
+    """Карточка вида Trefle (через кэш по id); при ошибке - пустой словарь"""
+    async def fetch():
+        response = await trefle_get(f"/species/{species_id}")
+        if not response.is_success:
+            raise TrefleError(response.status_code)
+        return response.json().get('data', {})
+
     try:
-        latin_name = GoogleTranslator(source='ru', target='la').translate(russian_name)
-        return latin_name
-    except Exception as e:
-        logger.error(f"Translation error: {e}")
+        return await trefle_cache.get(f"species:{species_id}", fetch)
+    except (TrefleError, httpx.HTTPError) as e:
+        logger.warning(f"Trefle species {species_id}: {e}")
+        return {}
+
+
+async def find_local_species(query: str):
+    """Вид из локальной выгрузки Trefle (trefle_import.py) или None"""
+    rows = await async_database.search_trefle_species(query)
+    return json.loads(rows[0]) if rows else None
+
+
+async def find_remote_plant(search_query: str):
+    """Первый результат поиска Trefle API с карточкой вида или None"""
+    data = await search_plants(search_query)
+    logger.info(f"📊 ОТЛАДКА: Найдено результатов: {len(data)}")
+    if not data:
         return None
 
+    plant = dict(data[0])
+    plant_id = plant.get('id')
+    if plant_id:
+        plant_detail = await get_species(plant_id)
+        logger.info(f"🔍 ОТЛАДКА: Детальная информация получена: {bool(plant_detail)}")
+        plant.update(plant_detail)
+    return plant
+
 
 def get_light_description(light_level):
     """Описание уровня освещения"""
@@ -84,7 +152,7 @@ def get_toxicity_description(toxicity):
 def get_care_difficulty(plant_data):
     """Определяем сложность ухода на основе данных"""
     score = 0
-    growth = plant_data.get('growth', {})
+    growth = plant_data.get('growth') or {}
 
     if growth.get('ph_minimum') and growth.get('ph_maximum'):
         score += 1
@@ -105,11 +173,11 @@ def get_care_difficulty(plant_data):
 
 def get_available_care_data(plant_data):
     """Собираем ВСЮ доступную информацию о растении"""
-    growth = plant_data.get('growth', {})
-    specs = plant_data.get('specifications', {})
-    foliage = plant_data.get('foliage', {})
-    flower = plant_data.get('flower', {})
-    fruit = plant_data.get('fruit_or_seed', {})
+    growth = plant_data.get('growth') or {}
+    specs = plant_data.get('specifications') or {}
+    foliage = plant_data.get('foliage') or {}
+    flower = plant_data.get('flower') or {}
+    fruit = plant_data.get('fruit_or_seed') or {}
 
     care_info = []
 
@@ -123,8 +191,8 @@ def get_available_care_data(plant_data):
         else:
             water_section.append("💧 Редкий полив")
 
-    min_precip = growth.get('minimum_precipitation', {}).get('mm')
-    max_precip = growth.get('maximum_precipitation', {}).get('mm')
+    min_precip = (growth.get('minimum_precipitation') or {}).get('mm')
+    max_precip = (growth.get('maximum_precipitation') or {}).get('mm')
     if min_precip and max_precip:
         water_section.append(f"🌧️ Осадки: {min_precip}-{max_precip} мм/год")
 
@@ -139,8 +207,8 @@ def get_available_care_data(plant_data):
         if light_desc:
             light_temp_section.append(f"☀️ Освещение: {light_desc}")
 
-    min_temp = growth.get('minimum_temperature', {}).get('deg_c')
-    max_temp = growth.get('maximum_temperature', {}).get('deg_c')
+    min_temp = (growth.get('minimum_temperature') or {}).get('deg_c')
+    max_temp = (growth.get('maximum_temperature') or {}).get('deg_c')
     if min_temp and max_temp:
         light_temp_section.append(f"🌡️ Температура: {min_temp}°C - {max_temp}°C")
     elif min_temp:
@@ -177,8 +245,8 @@ def get_available_care_data(plant_data):
 
     characteristics_section = []
 
-    avg_height = specs.get('average_height', {}).get('cm')
-    max_height = specs.get('maximum_height', {}).get('cm')
+    avg_height = (specs.get('average_height') or {}).get('cm')
+    max_height = (specs.get('maximum_height') or {}).get('cm')
     if avg_height and max_height:
         characteristics_section.append(f"📏 Высота: {avg_height}-{max_height} см")
     elif avg_height:
@@ -204,17 +272,17 @@ def get_available_care_data(plant_data):
 
     reproduction_section = []
 
-    bloom_months = growth.get('bloom_months', [])
+    bloom_months = growth.get('bloom_months') or []
     if bloom_months:
         translated_months = [MONTHS_TRANSLATION.get(month.lower(), month) for month in bloom_months]
         reproduction_section.append(f"🌸 Цветение: {', '.join(translated_months)}")
 
-    fruit_months = growth.get('fruit_months', [])
+    fruit_months = growth.get('fruit_months') or []
     if fruit_months:
         translated_months = [MONTHS_TRANSLATION.get(month.lower(), month) for month in fruit_months]
         reproduction_section.append(f"🍓 Плодоношение: {', '.join(translated_months)}")
 
-    flower_color = flower.get('color', [])
+    flower_color = flower.get('color') or []
     if flower_color:
         reproduction_section.append(f"🎨 Цвет: {', '.join(flower_color)}")
 
@@ -241,7 +309,7 @@ def get_available_care_data(plant_data):
 
 async def trefle_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Запуск поиска растений"""
-    if not TREFLE_API_KEY:
+    if not TREFLE_API_KEY and not await async_database.count_trefle_species():
         await update.message.reply_text(
             "❌ API ключ Trefle не настроен. Функция поиска временно недоступна."
         )
@@ -256,13 +324,13 @@ async def trefle_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• Ficus benjamina\n"
         "• Орхидея",
         parse_mode="Markdown",
-        reply_markup=ReplyKeyboardMarkup([["⬅️ Назад"]], resize_keyboard=True),
+        reply_markup=BACK_MENU,
     )
     return ASK_NAME
 
 
 async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Умный поиск растения в Trefle API с авто-переводом"""
+    """Умный поиск растения: сначала в локальной выгрузке Trefle, затем в Trefle API, с авто-переводом"""
     query = update.message.text.strip()
 
     if query == "⬅️ Назад":
@@ -273,33 +341,29 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         language = detect_language(query)
 
-        if language == 'russian':
-            latin_query = translate_to_latin(query)
-            search_query = latin_query if latin_query else query
-            logger.info(f"🔤 ОТЛАДКА: Перевод '{query}' -> '{latin_query}'")
-        else:
-            search_query = query
+        search_query = query
+        # Русские общие названия из выгрузки находятся и без перевода
+        plant = await find_local_species(query) if language == 'russian' else None
+
+        if plant is None:
+            if language == 'russian':
+                latin_query = await translate_to_latin(query)
+                search_query = latin_query if latin_query else query
+                logger.info(f"🔤 ОТЛАДКА: Перевод '{query}' -> '{latin_query}'")
+            plant = await find_local_species(search_query)
 
         context.user_data['original_query'] = query
         context.user_data['search_query'] = search_query
 
-        url = f"{TREFLE_BASE_URL}/plants/search"
-        params = {
-            'q': search_query,
-            'token': TREFLE_API_KEY
-        }
-
-        logger.info(f"🔍 ОТЛАДКА: Поисковый запрос: {search_query}")
-        response = requests.get(url, params=params, timeout=15)
-
-        if not response.ok:
-            await searching_msg.edit_text(f"❌ Ошибка при поиске (код {response.status_code})")
-            return ASK_NAME
-
-        data = response.json().get("data", [])
-        logger.info(f"📊 ОТЛАДКА: Найдено результатов: {len(data)}")
+        logger.info(f"🔍 ОТЛАДКА: Поисковый запрос: {search_query}, найдено локально: {plant is not None}")
+        if plant is None and TREFLE_API_KEY:
+            try:
+                plant = await find_remote_plant(search_query)
+            except TrefleError as e:
+                await searching_msg.edit_text(f"❌ Ошибка при поиске (код {e.status_code})")
+                return ASK_NAME
 
-        if not data:
+        if plant is None:
             await searching_msg.edit_text(
                 f"🌱 *Растение не найдено*\n\n"
                 f"*Ваш запрос:* {query}\n"
@@ -312,19 +376,8 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return ASK_NAME
 
-        plant = data[0]
         await searching_msg.delete()
 
-        plant_id = plant.get('id')
-        if plant_id:
-            detail_url = f"{TREFLE_BASE_URL}/species/{plant_id}"
-            detail_params = {'token': TREFLE_API_KEY}
-            detail_response = requests.get(detail_url, params=detail_params, timeout=10)
-            if detail_response.ok:
-                plant_detail = detail_response.json().get('data', {})
-                logger.info(f"🔍 ОТЛАДКА: Детальная информация получена: {bool(plant_detail)}")
-                plant.update(plant_detail)
-
         common_name = plant.get('common_name')
         scientific_name = plant.get('scientific_name')
         family = plant.get('family_common_name') or plant.get('family')
@@ -369,8 +422,6 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
             text += "Детальная информация об уходе отсутствует в базе данных.\n"
             text += "Рекомендуем обратиться в чат с агрономом - он обязательно поможет!\n\n"
 
-        keyboard = [["🔍 Найти другое растение", "⬅️ Назад"]]
-
         if image_url:
             try:
                 if len(text) > 1000:
@@ -379,7 +430,7 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         photo=image_url,
                         caption=short_text,
                         parse_mode="Markdown",
-                        reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+                        reply_markup=SEARCH_RESULT_MENU
                     )
                     if len(text) > 800:
                         remaining_text = text[800:]
@@ -392,14 +443,14 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         photo=image_url,
                         caption=text,
                         parse_mode="Markdown",
-                        reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+                        reply_markup=SEARCH_RESULT_MENU
                     )
             except Exception as e:
                 logger.error(f"Error sending photo: {e}")
                 await update.message.reply_text(
                     text + f"\n\n*Изображение:* {image_url}",
                     parse_mode="Markdown",
-                    reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+                    reply_markup=SEARCH_RESULT_MENU
                 )
         else:
             if len(text) > 4000:
@@ -409,7 +460,7 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         await update.message.reply_text(
                             part,
                             parse_mode="Markdown",
-                            reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+                            reply_markup=SEARCH_RESULT_MENU
                         )
                     else:
                         await update.message.reply_text(part, parse_mode="Markdown")
@@ -417,19 +468,19 @@ async def trefle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text(
                     text,
                     parse_mode="Markdown",
-                    reply_markup=ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+                    reply_markup=SEARCH_RESULT_MENU
                 )
 
         return AFTER_SEARCH
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         await searching_msg.edit_text(
             "⏰ *Таймаут запроса*\n\n"
             "Поиск занял слишком много времени. Попробуйте позже.",
             parse_mode="Markdown"
         )
         return ASK_NAME
-    except requests.exceptions.ConnectionError:
+    except httpx.NetworkError:
         await searching_msg.edit_text(
             "🌐 *Ошибка соединения*\n\n"
             "Проверьте подключение к интернету и попробуйте снова.",
@@ -454,7 +505,7 @@ async def handle_after_search_actions(update: Update, context: ContextTypes.DEFA
             "🔍 *Умный поиск растений*\n\n"
             "Введите название растения на русском или латыни:",
             parse_mode="Markdown",
-            reply_markup=ReplyKeyboardMarkup([["⬅️ Назад"]], resize_keyboard=True),
+            reply_markup=BACK_MENU,
         )
         return ASK_NAME
     elif text == "⬅️ Назад":
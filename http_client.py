@@ -0,0 +1,50 @@
+"""Общий асинхронный HTTP-клиент для внешних API (plant.id, Trefle, GigaChat).
+
+Клиенты держат keep-alive пулы соединений по хостам и переиспользуются между
+запросами; HTTP/2 включается, если установлен пакет h2.
+"""
+import logging
+
+import httpx
+
+from config import HTTP_CLIENT
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+
+
+def get_client(verify: bool = True) -> httpx.AsyncClient:
+    """Клиент с пулом соединений (отдельный для запросов без проверки сертификата)"""
+    client = _clients.get(verify)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            verify=verify,
+            timeout=httpx.Timeout(
+                HTTP_CLIENT['timeout'],
+                connect=HTTP_CLIENT['connect_timeout'],
+                pool=HTTP_CLIENT['pool_timeout'],
+            ),
+            limits=httpx.Limits(
+                max_connections=HTTP_CLIENT['max_connections'],
+                max_keepalive_connections=HTTP_CLIENT['max_keepalive_connections'],
+                keepalive_expiry=HTTP_CLIENT['keepalive_expiry'],
+            ),
+        )
+        _clients[verify] = client
+    return client
+
+
+async def close():
+    """Закрыть все пулы соединений (при остановке бота)"""
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+    logger.info("🌐 HTTP-клиенты закрыты")
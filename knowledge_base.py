@@ -0,0 +1,88 @@
+"""Справочник болезней и растений: SQLite-таблицы kb_* и снимок в памяти процесса.
+
+Снимок (KnowledgeSnapshot) неизменяем и заменяется целиком. Первое обращение
+загружает его из БД, затем фоновая задача раз в KNOWLEDGE_BASE['reload_seconds']
+сверяет версию справочника (kb_meta) и перечитывает таблицы, если её изменил
+этот или другой процесс. Изменения пишутся в БД (add_new_disease/add_new_plant
+в handlers.disease_dictionary) и сразу повышают версию.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+import async_database
+import database
+from config import KNOWLEDGE_BASE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    version: int = 0
+    disease_translations: dict = field(default_factory=dict)
+    disease_descriptions: dict = field(default_factory=dict)
+    treatments: dict = field(default_factory=dict)
+    plant_translations: dict = field(default_factory=dict)
+    watering_guide: dict = field(default_factory=dict)
+
+
+def _build_snapshot(version, diseases, plants, watering) -> KnowledgeSnapshot:
+    return KnowledgeSnapshot(
+        version=version,
+        disease_translations={name: translation for name, translation, _, _ in diseases},
+        disease_descriptions={name: description for name, _, description, _ in diseases if description},
+        treatments={name: treatment for name, _, _, treatment in diseases if treatment},
+        plant_translations=dict(plants),
+        watering_guide=dict(watering),
+    )
+
+
+class KnowledgeBase:
+    def __init__(self, reload_seconds: float):
+        self.reload_seconds = reload_seconds
+        self._snapshot = None
+        self._task = None
+
+    def snapshot(self) -> KnowledgeSnapshot:
+        """Текущий снимок; при первом обращении загружается из БД"""
+        if self._snapshot is None:
+            self._snapshot = _build_snapshot(*database.load_knowledge_base())
+        return self._snapshot
+
+    def invalidate(self):
+        """Перечитать справочник при следующем обращении (после синхронной записи)"""
+        self._snapshot = None
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    async def reload(self, force: bool = False) -> bool:
+        """Перечитать справочник, если версия в БД изменилась"""
+        if not force and self._snapshot is not None:
+            if await async_database.get_kb_version() == self._snapshot.version:
+                return False
+        self._snapshot = _build_snapshot(*await async_database.load_knowledge_base())
+        logger.info(f"📚 Справочник загружен, версия {self._snapshot.version}")
+        return True
+
+    def start(self):
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось обновить справочник: {e}")
+
+
+knowledge_base = KnowledgeBase(**KNOWLEDGE_BASE)
@@ -0,0 +1,41 @@
+"""Простые гистограммы задержек для служебной статистики (/stats)."""
+import bisect
+
+# Границы корзин в секундах
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами: счётчики, сумма и оценка перцентилей"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float):
+        """Верхняя граница корзины, в которую попадает q-й перцентиль (None, если данных нет)"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def format(self) -> str:
+        """Непустые корзины в виде '≤1 с: 5 · ≤5 с: 2 · >120 с: 1'"""
+        labels = [f"≤{bound:g} с" for bound in self.buckets] + [f">{self.buckets[-1]:g} с"]
+        parts = [f"{label}: {count}" for label, count in zip(labels, self.counts) if count]
+        return " · ".join(parts) or "нет данных"
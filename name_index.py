@@ -0,0 +1,57 @@
+"""Поиск названий (растений) в тексте по префиксному дереву.
+
+Названия нормализуются (регистр, ё, пробелы) и складываются в trie. Текст
+проходится от начала каждого слова, из найденных названий выбирается самое
+длинное, при равной длине - самое раннее: "фикус бенджамина" побеждает "фикус",
+независимо от порядка записей в словаре. Стоимость не зависит от размера словаря.
+"""
+import re
+
+_word_start = re.compile(r"(?<!\w)\w")
+
+_KEY = object()
+
+
+def normalize_name(text: str) -> str:
+    return " ".join(text.lower().replace("ё", "е").split())
+
+
+class NameIndex:
+    def __init__(self, names=()):
+        """names - пары (название, ключ); ключ возвращается при совпадении"""
+        self._root = {}
+        self._size = 0
+        for name, key in names:
+            self.add(name, key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, name: str, key):
+        name = normalize_name(name)
+        if not name:
+            return
+        node = self._root
+        for char in name:
+            node = node.setdefault(char, {})
+        if _KEY not in node:
+            self._size += 1
+        node[_KEY] = key
+
+    def find(self, text: str):
+        """Ключ самого длинного названия, встречающегося в тексте с начала слова, или None"""
+        text = normalize_name(text)
+        root = self._root
+        best_key, best_length = None, 0
+        for match in _word_start.finditer(text):
+            start = match.start()
+            if text[start] not in root:
+                continue
+            node = root
+            for index in range(start, len(text)):
+                node = node.get(text[index])
+                if node is None:
+                    break
+                if _KEY in node and index + 1 - start > best_length:
+                    best_key, best_length = node[_KEY], index + 1 - start
+        return best_key
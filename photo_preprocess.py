@@ -0,0 +1,89 @@
+"""Подготовка фото перед отправкой в plant.id.
+
+Из размеров, которые хранит Telegram, выбирается наименьший достаточный, а если
+он всё равно больше бюджета, изображение уменьшается и пережимается в JPEG в
+отдельном ограниченном пуле потоков, чтобы не блокировать event loop.
+"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PHOTO_PREPROCESS
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+_pool = ThreadPoolExecutor(max_workers=PHOTO_PREPROCESS['workers'], thread_name_prefix="photo")
+
+
+def select_photo_size(photo_sizes, min_side: int = None):
+    """Наименьший PhotoSize, у которого меньшая сторона не меньше min_side (иначе самый большой)"""
+    min_side = min_side or PHOTO_PREPROCESS['min_side']
+    sizes = sorted(photo_sizes, key=lambda size: size.width * size.height)
+    for size in sizes:
+        if min(size.width, size.height) >= min_side:
+            return size
+    return sizes[-1]
+
+
+def _recompress(data, max_side: int, max_bytes: int) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((max_side, max_side))
+
+        result = None
+        for quality in (85, 75, 65, 55):
+            out = io.BytesIO()
+            image.save(out, format="JPEG", quality=quality, optimize=True)
+            result = out.getvalue()
+            if len(result) <= max_bytes:
+                break
+        return result
+
+
+def _dhash(data) -> int:
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("L", (64, 64))
+        pixels = list(image.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+async def perceptual_hash(data):
+    """64-битный разностный хэш (dHash) фото; None, если Pillow недоступен или фото не читается"""
+    if Image is None:
+        return None
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_pool, _dhash, data)
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось вычислить хэш фото: {e}")
+        return None
+
+
+async def prepare_image(data):
+    """Уменьшить фото до бюджета PHOTO_PREPROCESS['max_bytes'], если это нужно и возможно"""
+    max_bytes = PHOTO_PREPROCESS['max_bytes']
+    if len(data) <= max_bytes or Image is None:
+        return data
+
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            _pool, _recompress, data, PHOTO_PREPROCESS['max_side'], max_bytes
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось пережать фото, отправляем оригинал: {e}")
+        return data
+
+    return result if len(result) < len(data) else data
@@ -0,0 +1,102 @@
+"""Клиент plant.id: идентификация растений и болезней по фото.
+
+Фото передаются как байтовые буферы в памяти. Тело запроса формируется потоково:
+base64 кодируется кусками прямо при отправке, без временных файлов и полных копий.
+"""
+import base64
+import json
+import os
+
+from dotenv import load_dotenv
+
+import http_client
+from singleflight import singleflight, fingerprint
+
+load_dotenv()
+
+API_KEY = os.getenv("PLANT_API_KEY")
+IDENTIFICATION_URL = "https://api.plant.id/v3/identification"
+
+# Кратно 3 байтам, чтобы base64 кусков склеивался без промежуточного паддинга
+B64_CHUNK_SIZE = 3 * 16 * 1024
+
+
+def base64_length(size: int) -> int:
+    return (size + 2) // 3 * 4
+
+
+def encode_identification_body(images, **params):
+    """Длина и потоковый генератор JSON-тела {"images": [...], **params}"""
+    prefix = b'{"images": ["'
+    separator = b'", "'
+    suffix = b'"], ' + json.dumps(params)[1:].encode("utf-8")
+
+    length = len(prefix) + len(suffix) + len(separator) * (len(images) - 1)
+    length += sum(base64_length(len(image)) for image in images)
+
+    async def body():
+        yield prefix
+        for index, image in enumerate(images):
+            if index:
+                yield separator
+            view = memoryview(image)
+            for offset in range(0, len(view), B64_CHUNK_SIZE):
+                yield base64.b64encode(view[offset:offset + B64_CHUNK_SIZE])
+        yield suffix
+
+    return length, body()
+
+
+class APIError(Exception):
+    """plant.id вернул ошибку"""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"plant.id {status_code}")
+        self.status_code = status_code
+        self.text = text
+
+
+async def _identify(images, timeout):
+    length, body = encode_identification_body(images, health="all", classification_level="species")
+    headers = {
+        "Api-Key": API_KEY,
+        "Content-Type": "application/json",
+        "Content-Length": str(length),
+    }
+    return await http_client.get_client().post(IDENTIFICATION_URL, headers=headers, content=body, timeout=timeout)
+
+
+async def identify(images, timeout: float = 30):
+    """Запрос идентификации; images - список bytes/bytearray с JPEG.
+
+    Одновременные запросы с теми же фото выполняются один раз.
+    """
+    key = ("plant.id", fingerprint(*images))
+    return await singleflight.do(key, lambda: _identify(images, timeout))
+
+
+def parse_identification(result: dict, max_species: int = 3) -> dict:
+    """Компактный результат идентификации: признак растения, виды и болезни"""
+    data = result.get("result") or {}
+    species = [
+        {
+            "name": suggestion.get("name"),
+            "probability": suggestion.get("probability", 0),
+            "common_names": (suggestion.get("details") or {}).get("common_names") or [],
+        }
+        for suggestion in (data.get("classification") or {}).get("suggestions", [])[:max_species]
+    ]
+    diseases = [
+        {
+            "name": suggestion.get("name"),
+            "probability": suggestion.get("probability", 0),
+            "description": (suggestion.get("details") or {}).get("description") or "",
+            "treatment": (suggestion.get("details") or {}).get("treatment") or {},
+        }
+        for suggestion in (data.get("disease") or {}).get("suggestions", [])
+    ]
+    return {
+        "is_plant": (data.get("is_plant") or {}).get("binary"),
+        "species": species,
+        "diseases": diseases,
+    }
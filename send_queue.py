@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import timedelta
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+from config import SEND_QUEUE
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Глобальный лимит отправки: rate сообщений в секунду с запасом capacity"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SendQueue:
+    """Очередь исходящих сообщений с пулом воркеров и лимитами Telegram.
+
+    Соблюдает глобальный лимит (~30 сообщений/с) и лимит на чат (1 сообщение/с),
+    ждёт при RetryAfter и повторяет временные сетевые ошибки с джиттером.
+    """
+
+    def __init__(self, workers: int, global_rate: float, per_chat_rate: float, max_retries: int):
+        self.workers = workers
+        self.per_chat_interval = 1 / per_chat_rate
+        self.max_retries = max_retries
+        self._bucket = TokenBucket(global_rate)
+        self._queue = None
+        self._tasks = []
+        self._chat_next = {}
+        self._paused_until = 0.0
+        self._sent_times = deque()
+        self._in_flight = 0
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"📤 Очередь отправки остановлена: {self.stats()}")
+
+    def submit(self, chat_id: int, send) -> asyncio.Future:
+        """Поставить отправку в очередь; send - функция без аргументов, возвращающая корутину"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((chat_id, send, future))
+        return future
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._trim_sent_times(now)
+        return {
+            'queued': self._queue.qsize() if self._queue else 0,
+            'in_flight': self._in_flight,
+            'sent': self._sent,
+            'failed': self._failed,
+            'retries': self._retries,
+            'per_second': round(len(self._sent_times) / 60, 2),
+        }
+
+    async def _worker(self):
+        while True:
+            chat_id, send, future = await self._queue.get()
+            self._in_flight += 1
+            try:
+                result = await self._deliver(chat_id, send)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self._failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    async def _deliver(self, chat_id, send):
+        attempt = 0
+        while True:
+            await self._wait_for_slot(chat_id)
+            try:
+                result = await send()
+            except RetryAfter as e:
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                # 429 относится ко всему боту, поэтому приостанавливаем все воркеры
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                logger.warning(f"⏳ Telegram RetryAfter {delay} с (чат {chat_id})")
+            except (BadRequest, Forbidden):
+                raise
+            except NetworkError as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = min(2 ** attempt, 60) * random.uniform(0.5, 1.5)
+                logger.warning(f"🔁 Повтор отправки в чат {chat_id} через {delay:.1f} с: {e}")
+                await asyncio.sleep(delay)
+            else:
+                now = time.monotonic()
+                self._sent += 1
+                self._sent_times.append(now)
+                self._trim_sent_times(now)
+                return result
+            self._retries += 1
+
+    async def _wait_for_slot(self, chat_id):
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        now = time.monotonic()
+        slot = max(now, self._chat_next.get(chat_id, 0.0))
+        self._chat_next[chat_id] = slot + self.per_chat_interval
+        if len(self._chat_next) > 10000:
+            self._chat_next = {cid: t for cid, t in self._chat_next.items() if t > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+        await self._bucket.acquire()
+
+    def _trim_sent_times(self, now):
+        while self._sent_times and self._sent_times[0] < now - 60:
+            self._sent_times.popleft()
+
+
+send_queue = SendQueue(**SEND_QUEUE)
@@ -0,0 +1,52 @@
+"""Объединение одинаковых одновременных запросов к внешним API (single-flight).
+
+Пока запрос с некоторым ключом выполняется, повторные вызовы с тем же ключом не
+идут во внешний сервис, а ждут тот же результат (или то же исключение). Ключ -
+кортеж, первый элемент которого - имя сервиса, по нему ведётся статистика.
+"""
+import asyncio
+import hashlib
+from collections import Counter
+
+
+def fingerprint(*parts) -> str:
+    """Короткий отпечаток содержимого запроса (bytes или str)"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, (bytes, bytearray, memoryview)) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self.calls = Counter()
+        self.shared = Counter()
+
+    async def do(self, key: tuple, factory):
+        """Результат factory() с объединением одновременных вызовов по ключу"""
+        task = self._calls.get(key)
+        if task is None:
+            self.calls[key[0]] += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared[key[0]] += 1
+
+        # Отмена одного ожидающего не должна отменять общий запрос для остальных
+        return await asyncio.shield(task)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._calls
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        """Для каждого сервиса: (запросов во внешний API, вызовов, получивших общий результат)"""
+        return {service: (self.calls[service], self.shared[service]) for service in self.calls}
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,83 @@
+"""Лёгкая нормализация русских слов для поиска по симптомам.
+
+Окончание отрезается по списку (самое длинное подходящее, основа не короче трёх
+букв), затем уменьшительный суффикс, и основа обрезается до STEM_LENGTH букв.
+Для слов с глагольной приставкой дополнительно выдаётся основа без неё, чтобы
+"пожелтели" совпадало с "желтые", а "почернение" - с "черный".
+"""
+import re
+from functools import lru_cache
+
+STEM_LENGTH = 6
+MIN_STEM = 3
+
+ENDINGS = sorted({
+    # существительные
+    "ениями", "ением", "ения", "ение", "ении", "анием", "ания", "ание", "ании",
+    "ями", "ами", "иям", "иях", "ией", "ьях", "ьям", "ьев",
+    "ях", "ах", "ям", "ам", "ов", "ев", "ей", "ом", "ем", "ью", "ья", "ье", "ьи", "ию", "ия", "ии",
+    # прилагательные и причастия
+    "ыми", "ими", "ого", "его", "ому", "ему", "ых", "их", "ый", "ий", "ой", "ая", "яя",
+    "ое", "ее", "ую", "юю", "ые", "ие", "вшие", "вший", "вшая", "вшее",
+    # глаголы
+    "ают", "яют", "еют", "уют", "еет", "ешь", "ишь", "ить", "ать", "ять", "еть", "уть",
+    "ели", "ела", "ело", "или", "ила", "ило", "али", "ала", "ало",
+    "ет", "ит", "ут", "ют", "ат", "ят", "ел", "ил", "ал", "ли", "ла", "ло",
+    # одиночные гласные и мягкий знак
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь",
+}, key=len, reverse=True)
+
+# Короткие глагольные окончания совпадают с концом многих существительных ("налет"),
+# поэтому отрезаются, только если остаётся основа от четырёх букв
+SHORT_VERB_ENDINGS = {"ет", "ит", "ат", "ят", "ел", "ил", "ал", "ли", "ла", "ло"}
+
+REFLEXIVE = ("ся", "сь")
+DIMINUTIVE = ("очк", "ечк", "оньк", "еньк")
+PREFIXES = ("пере", "при", "про", "по", "за", "вы", "от")
+
+STOP_WORDS = {
+    "и", "в", "во", "на", "с", "со", "у", "к", "по", "за", "из", "от", "до", "не", "ни", "но",
+    "а", "или", "что", "как", "это", "так", "же", "ли", "бы", "то", "мой", "моя", "мое", "мои",
+    "его", "ее", "их", "очень", "какой", "какие", "какая", "есть", "стал", "стали", "стало",
+}
+
+_word = re.compile(r"[а-яёa-z]+")
+
+
+def tokenize(text: str):
+    """Слова текста в нижнем регистре, без стоп-слов"""
+    return [word for word in _word.findall(text.lower().replace("ё", "е")) if word not in STOP_WORDS]
+
+
+def _strip(word: str) -> str:
+    for suffix in REFLEXIVE:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)]
+            break
+    for ending in ENDINGS:
+        min_stem = MIN_STEM + 1 if ending in SHORT_VERB_ENDINGS else MIN_STEM
+        if word.endswith(ending) and len(word) - len(ending) >= min_stem:
+            word = word[:-len(ending)]
+            break
+    for suffix in DIMINUTIVE:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)]
+            break
+    return word
+
+
+def stem(word: str) -> str:
+    """Основа слова"""
+    return _strip(word.lower().replace("ё", "е"))[:STEM_LENGTH]
+
+
+@lru_cache(maxsize=65536)
+def stem_forms(word: str) -> frozenset:
+    """Основа слова и, если есть приставка, основа без неё (с кэшем: слова повторяются)"""
+    base = _strip(word.lower().replace("ё", "е"))
+    forms = {base[:STEM_LENGTH]}
+    for prefix in PREFIXES:
+        if base.startswith(prefix) and len(base) - len(prefix) >= MIN_STEM + 1:
+            forms.add(base[len(prefix):][:STEM_LENGTH])
+            break
+    return frozenset(forms)
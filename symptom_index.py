@@ -0,0 +1,68 @@
+"""Инвертированный индекс симптомов по нормализованным словам.
+
+Каждый симптом из PLANT_DISEASES разбивается на основы слов (stemmer). Симптом
+считается найденным, если в сообщении встретились основы всех его слов в любом
+порядке и форме ("листья желтеют" - "желтые листья"). Болезни с найденными
+симптомами ранжируются по TF-IDF: редкие для словаря основы весят больше частых.
+"""
+import math
+from collections import defaultdict
+
+from stemmer import tokenize, stem, stem_forms
+
+
+class SymptomIndex:
+    def __init__(self, diseases: dict):
+        self.diseases = list(diseases)
+        # основа -> [(id симптома, номер слова в симптоме)]
+        self._postings = defaultdict(list)
+        self._symptom_disease = []
+        self._symptom_size = []
+        # основа -> {болезнь: сколько раз встречается в её симптомах}
+        term_counts = defaultdict(lambda: defaultdict(int))
+        disease_terms = defaultdict(int)
+
+        for disease, info in diseases.items():
+            for symptom in info['symptoms']:
+                symptom_id = len(self._symptom_disease)
+                words = tokenize(symptom)
+                self._symptom_disease.append(disease)
+                self._symptom_size.append(len(words))
+                for position, word in enumerate(words):
+                    for form in stem_forms(word):
+                        self._postings[form].append((symptom_id, position))
+                    term_counts[stem(word)][disease] += 1
+                    disease_terms[disease] += 1
+
+        total = len(self.diseases)
+        self._weights = {}
+        for term, counts in term_counts.items():
+            idf = math.log(1 + total / len(counts))
+            self._weights[term] = {
+                disease: count * idf / math.sqrt(disease_terms[disease])
+                for disease, count in counts.items()
+            }
+
+    def search(self, text: str) -> dict:
+        """{болезнь: оценка} для болезней, у которых найден хотя бы один симптом"""
+        query_forms = set()
+        for word in tokenize(text):
+            query_forms.update(stem_forms(word))
+
+        matched_words = defaultdict(set)
+        for form in query_forms:
+            for symptom_id, position in self._postings.get(form, ()):
+                matched_words[symptom_id].add(position)
+
+        candidates = {
+            self._symptom_disease[symptom_id]
+            for symptom_id, positions in matched_words.items()
+            if len(positions) == self._symptom_size[symptom_id]
+        }
+
+        scores = dict.fromkeys(candidates, 0.0)
+        for form in query_forms:
+            for disease, weight in self._weights.get(form, {}).items():
+                if disease in scores:
+                    scores[disease] += weight
+        return scores
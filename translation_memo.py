@@ -0,0 +1,80 @@
+"""Перевод русских названий растений на латынь с запоминанием в БД.
+
+Таблица latin_translations заполнена названиями из справочников растений и
+полива, поэтому популярные запросы переводятся без обращения к переводчику.
+Новые переводы сохраняются; неудачные (ошибка или перевод не отличается от
+запроса) запоминаются как NULL на negative_ttl_seconds, чтобы не повторять
+запрос к переводчику. Переводчик один на процесс и работает в отдельном потоке.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from deep_translator import GoogleTranslator
+
+import async_database
+from config import TRANSLATION_MEMO
+from name_index import normalize_name
+from singleflight import singleflight
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationMemo:
+    def __init__(self, negative_ttl_seconds: float):
+        self.negative_ttl = timedelta(seconds=negative_ttl_seconds)
+        self._translator = GoogleTranslator(source='ru', target='la')
+        # Один поток: экземпляр переводчика не рассчитан на одновременные вызовы
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="translator")
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def _translate_sync(self, text: str):
+        return self._translator.translate(text)
+
+    async def _translate(self, source: str):
+        try:
+            translation = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._translate_sync, source
+            )
+        except Exception as e:
+            logger.error(f"Translation error: {e}")
+            translation = None
+        translation = normalize_name(translation) if translation else None
+        if translation == source:
+            translation = None
+        if translation is None:
+            self.failures += 1
+        await async_database.save_latin_translation(source, translation)
+        return translation
+
+    async def translate(self, text: str):
+        """Латинское название или None, если перевести не удалось"""
+        source = normalize_name(text)
+        row = await async_database.get_latin_translation(source)
+        if row is not None:
+            translation, created_at = row
+            if translation is not None:
+                self.hits += 1
+                return translation
+            if datetime.utcnow() - datetime.fromisoformat(created_at) < self.negative_ttl:
+                self.negative_hits += 1
+                return None
+        self.misses += 1
+        return await singleflight.do(("translate", source), lambda: self._translate(source))
+
+    def stats(self) -> dict:
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'failures': self.failures,
+            'hit_rate': round((self.hits + self.negative_hits) / total * 100, 1) if total else 0.0,
+        }
+
+
+translation_memo = TranslationMemo(**TRANSLATION_MEMO)
@@ -0,0 +1,107 @@
+"""Двухуровневый кэш ответов Trefle (поиск по названию и карточки видов).
+
+Первый уровень - LRUCache в памяти процесса, второй - таблица trefle_cache в SQLite,
+общая для процессов и переживающая перезапуск. Ответ моложе fresh_seconds
+отдаётся сразу; более старый, но моложе max_age_seconds, тоже отдаётся сразу,
+а в фоне запрашивается новый (stale-while-revalidate). Кэшируются только
+успешные ответы, в том числе пустой результат поиска.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+
+import async_database
+from config import TREFLE_CACHE
+from lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class TrefleCache:
+    def __init__(self, max_size: int, fresh_seconds: float, max_age_seconds: float):
+        self.fresh = timedelta(seconds=fresh_seconds)
+        self.max_age = timedelta(seconds=max_age_seconds)
+        # Значение: (ответ, время получения)
+        self._memory = LRUCache(max_size, ttl=max_age_seconds)
+        self._refreshing = {}
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    async def _lookup(self, key: str):
+        entry = self._memory.get(key)
+        if entry is not None:
+            self.memory_hits += 1
+            return entry
+        row = await async_database.get_trefle_cache(key)
+        if row is None:
+            return None
+        payload, fetched_at = row
+        fetched_at = datetime.fromisoformat(fetched_at)
+        if datetime.utcnow() - fetched_at >= self.max_age:
+            return None
+        entry = (json.loads(payload), fetched_at)
+        self._memory.set(key, entry)
+        self.db_hits += 1
+        return entry
+
+    async def _fetch(self, key: str, fetch):
+        payload = await fetch()
+        fetched_at = datetime.utcnow().replace(microsecond=0)
+        self._memory.set(key, (payload, fetched_at))
+        await async_database.save_trefle_cache(key, json.dumps(payload, ensure_ascii=False), fetched_at.isoformat())
+        return payload
+
+    async def _refresh(self, key: str, fetch):
+        try:
+            await self._fetch(key, fetch)
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"⚠️ Не удалось обновить ответ Trefle {key}: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get(self, key: str, fetch):
+        """Ответ по ключу; fetch() - корутина запроса к Trefle, вызывается при промахе
+        (её исключения передаются вызывающему) или в фоне для устаревшего ответа"""
+        entry = await self._lookup(key)
+        if entry is not None:
+            payload, fetched_at = entry
+            age = datetime.utcnow() - fetched_at
+            if age < self.fresh:
+                return payload
+            if age < self.max_age:
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    self._refreshing[key] = asyncio.create_task(self._refresh(key, fetch))
+                return payload
+            self._memory.pop(key)
+        self.misses += 1
+        return await self._fetch(key, fetch)
+
+    async def purge(self) -> int:
+        """Удалить из БД ответы старше max_age_seconds"""
+        removed = await async_database.purge_trefle_cache(datetime.utcnow() - self.max_age)
+        if removed:
+            logger.info(f"🧹 Кэш Trefle: удалено {removed} устаревших ответов")
+        return removed
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        total = hits + self.misses
+        return {
+            'size': len(self._memory),
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshing': len(self._refreshing),
+            'refresh_errors': self.refresh_errors,
+            'hit_rate': round(hits / total * 100, 1) if total else 0.0,
+        }
+
+
+trefle_cache = TrefleCache(**TREFLE_CACHE)
@@ -0,0 +1,191 @@
+"""Импорт выгрузки видов Trefle в локальную таблицу trefle_species с индексом FTS5.
+
+Поддерживаются JSON (список видов, объект с ключом "data" или JSON Lines) в формате
+ответов /species/{id} и CSV-выгрузка Trefle (разделитель определяется по заголовку).
+Плоские столбцы CSV раскладываются в те же вложенные поля (growth, specifications,
+...), что и ответ API, поэтому карточка вида строится одинаково.
+
+Запуск: python trefle_import.py species.csv [ещё файлы...]
+"""
+import csv
+import json
+import math
+import os
+import sys
+from datetime import datetime
+
+import database
+
+BATCH_SIZE = 5000
+
+# Столбец CSV -> путь в записи в формате API
+CSV_FIELDS = {
+    'light': ('growth', 'light'),
+    'ground_humidity': ('growth', 'soil_humidity'),
+    'soil_humidity': ('growth', 'soil_humidity'),
+    'atmospheric_humidity': ('growth', 'atmospheric_humidity'),
+    'ph_minimum': ('growth', 'ph_minimum'),
+    'ph_maximum': ('growth', 'ph_maximum'),
+    'soil_nutriments': ('growth', 'soil_nutriments'),
+    'soil_texture': ('growth', 'soil_texture'),
+    'bloom_months': ('growth', 'bloom_months'),
+    'fruit_months': ('growth', 'fruit_months'),
+    'minimum_temperature_deg_c': ('growth', 'minimum_temperature', 'deg_c'),
+    'maximum_temperature_deg_c': ('growth', 'maximum_temperature', 'deg_c'),
+    'minimum_precipitation_mm': ('growth', 'minimum_precipitation', 'mm'),
+    'maximum_precipitation_mm': ('growth', 'maximum_precipitation', 'mm'),
+    'average_height_cm': ('specifications', 'average_height', 'cm'),
+    'maximum_height_cm': ('specifications', 'maximum_height', 'cm'),
+    'growth_form': ('specifications', 'growth_form'),
+    'growth_habit': ('specifications', 'growth_habit'),
+    'toxicity': ('specifications', 'toxicity'),
+    'foliage_texture': ('foliage', 'texture'),
+    'flower_color': ('flower', 'color'),
+}
+LIST_FIELDS = {'bloom_months', 'fruit_months', 'flower_color'}
+# Остальные столбцы CSV_FIELDS числовые
+STRING_FIELDS = {'growth_form', 'growth_habit', 'toxicity', 'foliage_texture'}
+TEXT_FIELDS = {'scientific_name', 'common_name', 'family', 'family_common_name', 'genus', 'image_url',
+               'observations'}
+
+
+def _split(value: str) -> list:
+    return [item.strip() for item in value.replace("|", ",").split(",") if item.strip()]
+
+
+def _number(value: str):
+    """Число или None, если значение не число (карточка сравнивает эти поля с числами)"""
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(number):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def _species_id(value):
+    """id вида или None для пустого и нечислового значения"""
+    try:
+        return int((value or "").strip())
+    except ValueError:
+        return None
+
+
+def record_from_csv(row: dict) -> dict:
+    """Строка CSV-выгрузки -> запись в формате ответа API (id=None у строк без корректного id)"""
+    record = {'id': _species_id(row.get('id'))}
+    for column, value in row.items():
+        # Лишние значения строки DictReader кладёт под ключ None
+        value = (value or "").strip() if column is not None else ""
+        if not value or column == 'id':
+            continue
+        if column in TEXT_FIELDS:
+            record[column] = value
+        elif column in ('synonyms', 'common_names'):
+            record[column] = _split(value)
+        elif column == 'edible':
+            record['edible'] = value.lower() in ('true', 't', '1', 'yes')
+        elif column in CSV_FIELDS:
+            if column in LIST_FIELDS:
+                value = _split(value)
+            elif column not in STRING_FIELDS:
+                value = _number(value)
+                if value is None:
+                    continue
+            *path, key = CSV_FIELDS[column]
+            node = record
+            for part in path:
+                node = node.setdefault(part, {})
+            node[key] = value
+    return record
+
+
+def _names(value) -> list:
+    """Названия из списка строк, списка объектов {"name": ...} или {язык: [названия]}"""
+    if not value:
+        return []
+    if isinstance(value, dict):
+        return [name for names in value.values() for name in (names or [])]
+    return [item.get('name') if isinstance(item, dict) else item for item in value if item]
+
+
+def _drop_empty(value):
+    if isinstance(value, dict):
+        cleaned = {key: _drop_empty(item) for key, item in value.items()}
+        return {key: item for key, item in cleaned.items() if item not in (None, {}, [], "")}
+    return value
+
+
+def species_row(record: dict, imported_at: str):
+    """Запись вида -> строка таблицы trefle_species"""
+    record = _drop_empty(record)
+    common_names = [record.get('common_name'), *_names(record.get('common_names'))]
+    synonyms = _names(record.get('synonyms'))
+    return (
+        record['id'],
+        record['scientific_name'],
+        " | ".join(dict.fromkeys(name for name in common_names if name)),
+        " | ".join(dict.fromkeys(name for name in synonyms if name)),
+        " ".join(filter(None, (record.get('family'), record.get('family_common_name')))),
+        json.dumps(record, ensure_ascii=False),
+        imported_at,
+    )
+
+
+def read_records(path: str):
+    """Записи видов из JSON, JSON Lines или CSV"""
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.endswith((".json", ".jsonl")):
+            if path.endswith(".jsonl"):
+                records = (json.loads(line) for line in file if line.strip())
+            else:
+                records = json.load(file)
+                if isinstance(records, dict):
+                    records = records.get('data', [])
+                    records = [records] if isinstance(records, dict) else records
+            for record in records:
+                # Ответ /species/{id} целиком: {"data": {...}}
+                yield record['data'] if isinstance(record.get('data'), dict) else record
+        else:
+            # Выгрузка Trefle разделена табуляцией; разделитель - самый частый символ в заголовке
+            header = file.readline()
+            file.seek(0)
+            delimiter = max("\t,;", key=header.count)
+            for row in csv.DictReader(file, delimiter=delimiter):
+                yield record_from_csv(row)
+
+
+def import_files(paths: list):
+    """Загрузить выгрузки; возвращает (загружено, пропущено строк без id или научного названия)"""
+    imported_at = datetime.utcnow().isoformat(timespec="seconds")
+    total = 0
+    skipped = 0
+    batch = []
+    for path in paths:
+        for record in read_records(path):
+            if isinstance(record.get('id'), str):
+                record['id'] = _species_id(record['id'])
+            if not isinstance(record.get('id'), int) or not record.get('scientific_name'):
+                skipped += 1
+                continue
+            batch.append(species_row(record, imported_at))
+            if len(batch) >= BATCH_SIZE:
+                total += database.import_trefle_species(batch)
+                batch = []
+    if batch:
+        total += database.import_trefle_species(batch)
+    database.rebuild_trefle_species_index()
+    return total, skipped
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    for path in sys.argv[1:]:
+        if not os.path.exists(path):
+            sys.exit(f"Файл не найден: {path}")
+    database.init_db()
+    count, skipped = import_files(sys.argv[1:])
+    print(f"🌿 Импортировано видов: {count}, пропущено строк: {skipped}, "
+          f"всего в локальной базе: {database.count_trefle_species()}")
@@ -0,0 +1,113 @@
+"""Статистика названий болезней и растений, которых нет в справочнике.
+
+Диагностика только отмечает промах в памяти (счётчик, сумма и максимум
+вероятности plant.id, время последнего появления). Фоновая задача раз в
+UNKNOWN_NAMES['flush_seconds'] (или раньше, если накопилось max_pending разных
+названий) записывает накопленное в таблицу unknown_names одной пачкой.
+Самые частые промахи показывает команда /unknown.
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+import async_database
+from config import UNKNOWN_NAMES
+
+logger = logging.getLogger(__name__)
+
+DISEASE = "disease"
+PLANT = "plant"
+
+
+class UnknownNames:
+    def __init__(self, flush_seconds: float, max_pending: int):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        # (вид, название) -> [сколько раз, сумма вероятностей, наибольшая вероятность, впервые, последний раз]
+        self._pending = {}
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self.recorded = 0
+        self.flushed = 0
+
+    def record(self, kind: str, name: str, probability: float = 0.0):
+        """Отметить название, не найденное в справочнике"""
+        now = datetime.utcnow().isoformat(timespec="seconds")
+        probability = probability or 0.0
+        entry = self._pending.get((kind, name.lower()))
+        if entry is None:
+            self._pending[(kind, name.lower())] = [1, probability, probability, now, now]
+            if len(self._pending) >= self.max_pending and self._wakeup is not None:
+                self._wakeup.set()
+        else:
+            entry[0] += 1
+            entry[1] += probability
+            entry[2] = max(entry[2], probability)
+            entry[4] = now
+        self.recorded += 1
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self):
+        """Записать накопленные промахи в БД"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [(kind, name, *entry) for (kind, name), entry in pending.items()]
+        try:
+            await async_database.record_unknown_names(rows)
+        except Exception:
+            # Вернуть несохранённое, чтобы не потерять счётчики
+            for key, entry in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = entry
+                else:
+                    current[0] += entry[0]
+                    current[1] += entry[1]
+                    current[2] = max(current[2], entry[2])
+                    current[3] = entry[3]
+            raise
+        self.flushed += len(rows)
+
+    async def top(self, limit: int):
+        """Самые частые промахи, с учётом ещё не сброшенных в БД"""
+        await self.flush()
+        return await async_database.get_top_unknown_names(limit)
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            # wait_for может поглотить отмену, если событие сработало одновременно с ней:
+            # тогда цикл завершится по флагу
+            self._stopping = True
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить статистику справочника: {e}")
+
+    async def _watch(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                return
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось сохранить статистику справочника: {e}")
+
+
+unknown_names = UnknownNames(**UNKNOWN_NAMES)
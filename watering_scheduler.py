@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class WateringScheduler:
+    """Планировщик напоминаний о поливе на основе min-кучи.
+
+    Каждое растение с графиком полива хранится в куче по времени следующего
+    полива. Вместо периодического сканирования таблицы `plants` планировщик
+    спит до ближайшего срока и будится при изменении графика.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._plants = {}
+        self._due = {}
+        # chat_id -> растения чата (для сводных напоминаний)
+        self._by_chat = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+
+    def __len__(self):
+        return len(self._due)
+
+    def seed(self, plants):
+        """Первичное заполнение из БД: (plant_id, name, interval, last_watered_at, chat_id, next_notify_at)"""
+        with self._lock:
+            self._heap.clear()
+            self._plants.clear()
+            self._due.clear()
+            self._by_chat.clear()
+            for plant_id, name, interval, last_watered, chat_id, next_notify_at in plants:
+                due_at = self._compute_due(interval, last_watered)
+                if due_at is not None:
+                    if next_notify_at:
+                        due_at = max(due_at, datetime.fromisoformat(next_notify_at))
+                    self._remember(plant_id, name, interval, chat_id)
+                    self._push(plant_id, due_at)
+        self._wake()
+        logger.info(f"🔔 Планировщик полива: загружено {len(self._due)} растений")
+
+    def schedule(self, plant_id, name, interval, last_watered, chat_id):
+        """Добавить или обновить растение в расписании"""
+        due_at = self._compute_due(interval, last_watered)
+        with self._lock:
+            if due_at is None:
+                self._forget(plant_id)
+                return
+            self._remember(plant_id, name, interval, chat_id)
+            self._push(plant_id, due_at)
+        self._wake()
+
+    def watered(self, plant_id, watered_at):
+        """Сдвинуть срок полива уже известного растения"""
+        with self._lock:
+            plant = self._plants.get(plant_id)
+            if plant is None:
+                return
+            self._push(plant_id, self._compute_due(plant[1], watered_at))
+        self._wake()
+
+    def snooze(self, plant_id, until):
+        """Отложить повторное напоминание до указанного времени"""
+        with self._lock:
+            if plant_id not in self._plants:
+                return
+            self._push(plant_id, until)
+        self._wake()
+
+    def unschedule(self, plant_id):
+        """Убрать растение из расписания (запись в куче удалится лениво)"""
+        with self._lock:
+            self._forget(plant_id)
+
+    def next_due(self):
+        """Время ближайшего полива или None"""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """Извлечь все растения, срок полива которых наступил"""
+        now = now or datetime.utcnow()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, _, plant_id = heapq.heappop(self._heap)
+                if self._due.get(plant_id) != due_at:
+                    continue
+                del self._due[plant_id]
+                name, interval, chat_id = self._plants[plant_id]
+                due.append((plant_id, name, interval, due_at, chat_id))
+        return due
+
+    def pop_chat_due(self, chat_ids, until):
+        """Извлечь растения указанных чатов со сроком не позже until (записи в куче удалятся лениво)"""
+        due = []
+        with self._lock:
+            for chat_id in chat_ids:
+                for plant_id in self._by_chat.get(chat_id, ()):
+                    due_at = self._due.get(plant_id)
+                    if due_at is not None and due_at <= until:
+                        name, interval, _ = self._plants[plant_id]
+                        due.append((plant_id, name, interval, due_at, chat_id))
+            for plant in due:
+                del self._due[plant[0]]
+        return due
+
+    def start(self, callback):
+        """Запустить фоновую задачу; callback(plants) вызывается для наступивших сроков"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(callback))
+
+    async def stop(self):
+        if self._task:
+            # wait_for может поглотить отмену, если событие сработало одновременно с ней:
+            # тогда цикл завершится по флагу
+            self._stopping = True
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, callback):
+        while not self._stopping:
+            self._wakeup.clear()
+            next_due = self.next_due()
+            if next_due is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = (next_due - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+                if self._stopping:
+                    return
+
+            plants = self.pop_due()
+            if plants:
+                try:
+                    await callback(plants)
+                except Exception as e:
+                    logger.error(f"❌ Ошибка обработки напоминаний: {e}")
+
+    def _remember(self, plant_id, name, interval, chat_id):
+        previous = self._plants.get(plant_id)
+        if previous is not None and previous[2] != chat_id:
+            self._by_chat.get(previous[2], set()).discard(plant_id)
+        self._plants[plant_id] = (name, interval, chat_id)
+        self._by_chat.setdefault(chat_id, set()).add(plant_id)
+
+    def _forget(self, plant_id):
+        plant = self._plants.pop(plant_id, None)
+        self._due.pop(plant_id, None)
+        if plant is not None:
+            chat_plants = self._by_chat.get(plant[2])
+            if chat_plants is not None:
+                chat_plants.discard(plant_id)
+                if not chat_plants:
+                    del self._by_chat[plant[2]]
+
+    def _push(self, plant_id, due_at):
+        self._due[plant_id] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._counter), plant_id))
+
+    def _drop_stale(self):
+        while self._heap:
+            due_at, _, plant_id = self._heap[0]
+            if self._due.get(plant_id) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def _wake(self):
+        if self._loop is None or self._wakeup is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    @staticmethod
+    def _compute_due(interval, last_watered):
+        if not interval or not last_watered:
+            return None
+        if isinstance(last_watered, str):
+            last_watered = datetime.fromisoformat(last_watered)
+        return last_watered + timedelta(days=interval)
+
+
+scheduler = WateringScheduler()